@@ -0,0 +1,80 @@
+"""
+Compares the desktop entry scanner against the ConfigParser-based scanner it replaced.
+
+    python -m benchmarks.desktop_entries --files 2000
+"""
+
+import argparse
+import configparser
+import os
+import tempfile
+import time
+from collections.abc import Callable
+
+from browsers import linux
+
+LOCALES = ("ar", "de", "es", "fr", "it", "ja", "ko", "nl", "pl", "pt_BR", "ru", "sv", "tr", "uk", "zh_CN", "zh_TW")
+
+
+def write_desktop_files(directory: str, count: int) -> None:
+    """
+    Writes desktop entries resembling a workstation image, one in a hundred of them is a browser.
+    """
+    for i in range(count):
+        is_browser = i % 100 == 0
+        name = "Firefox" if is_browser else f"Application {i}"
+        categories = "Network;WebBrowser;" if is_browser else "Utility;TextEditor;"
+        lines = ["[Desktop Entry]", "Type=Application", f"Name={name}", f"Exec=app-{i} %F", f"Categories={categories}"]
+        lines += [f"Name[{locale}]={name} ({locale})" for locale in LOCALES]
+        lines += [f"Comment[{locale}]=Edit files ({locale})" for locale in LOCALES]
+        lines += ["", "[Desktop Action new-window]", "Name=New Window", f"Exec=app-{i} --new-window"]
+        lines += [f"Name[{locale}]=New Window ({locale})" for locale in LOCALES]
+        with open(os.path.join(directory, f"app-{i}.desktop"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+def configparser_scan(directory: str) -> int:
+    found = 0
+    for name in os.listdir(directory):
+        config = configparser.ConfigParser(interpolation=None, strict=False)
+        config.read(os.path.join(directory, name), encoding="utf-8")
+        if (
+            "WebBrowser" in config.get("Desktop Entry", "Categories", fallback="").split(";")
+            or config.get("Desktop Entry", "GenericName", fallback="") == "Web Browser"
+        ):
+            found += 1
+    return found
+
+
+def scanner_scan(directory: str) -> int:
+    return sum(linux._read_desktop_entry(path) is not None for _, path in linux._desktop_files(directory))
+
+
+def best_of(function: Callable[[str], int], directory: str, repeat: int) -> tuple[float, int]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        found = function(directory)
+        timings.append(time.perf_counter() - start)
+    return min(timings), found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=2000, help="number of desktop entries")
+    parser.add_argument("--repeat", type=int, default=5, help="number of runs, the fastest is reported")
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_desktop_files(directory, options.files)
+        baseline, baseline_found = best_of(configparser_scan, directory, options.repeat)
+        scanner, scanner_found = best_of(scanner_scan, directory, options.repeat)
+
+    assert baseline_found == scanner_found
+    print(f"configparser: {baseline * 1000:8.1f} ms ({baseline_found} browsers in {options.files} files)")
+    print(f"scanner:      {scanner * 1000:8.1f} ms ({scanner_found} browsers in {options.files} files)")
+    print(f"speedup:      {baseline / scanner:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
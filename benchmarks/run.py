@@ -0,0 +1,145 @@
+"""
+Benchmarks detection, get() and launch() against a synthetic system and prints the results as JSON.
+
+macOS detection runs against synthetic application bundles and a stub mdfind.
+
+    python -m benchmarks.run --desktop-files 2000 --browsers 8 --latency 0.05 --output results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from importlib import metadata
+from typing import Any
+from unittest import mock
+
+import browsers
+from browsers import linux, osx, tracing
+
+from .synthetic import OUTPUT_FORMATS, SyntheticSystem
+
+
+@contextmanager
+def synthetic_environment(system: SyntheticSystem) -> Iterator[None]:
+    with mock.patch.dict(os.environ, system.environ()), mock.patch.object(linux, "XDG_DATA_LOCATIONS", ()):
+        yield
+
+
+def measure(system: SyntheticSystem, function: Callable[[], Any], repeat: int) -> dict[str, Any]:
+    """
+    Runs a function repeatedly and returns its timings (seconds), subprocess count and peak memory (bytes).
+    """
+    timings = []
+    peak_memory = 0
+    subprocesses = 0
+    for _ in range(repeat):
+        system.reset_invocations()
+        tracemalloc.start()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+        peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        subprocesses = system.invocations()
+
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "max": max(timings),
+        "subprocesses": subprocesses,
+        "peak_memory": peak_memory,
+    }
+
+
+def stages(repeat: int) -> dict[str, Any]:
+    """
+    Returns the fastest total time of each detection stage (see browsers.tracing) and the counters of that run.
+    Durations of stages running in parallel (e.g. version probes) are summed.
+    """
+    durations: dict[str, list[float]] = {}
+    counters: dict[str, int] = {}
+    for _ in range(repeat):
+        with tracing.recording() as recorder:
+            list(browsers.browsers())
+        for stage, duration in recorder.durations().items():
+            durations.setdefault(stage, []).append(duration)
+        counters = dict(recorder.counters)
+    return {"durations": {stage: min(values) for stage, values in durations.items()}, "counters": counters}
+
+
+def launch(system: SyntheticSystem, inventory: browsers.Inventory) -> None:
+    process = browsers.launch("chrome", inventory=inventory)
+    if process is not None:
+        process.wait()
+
+
+def run(options: argparse.Namespace) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as root:
+        system = SyntheticSystem(
+            root, options.desktop_files, options.browsers, options.latency, options.output_format, options.bundles
+        )
+        system.create()
+
+        with synthetic_environment(system):
+            inventory = browsers.Inventory()
+            inventory.browsers()
+            results = {
+                "detection": measure(system, lambda: list(browsers.browsers()), options.repeat),
+                "detection_stages": stages(options.repeat),
+                "get_hit": measure(system, lambda: browsers.get("chrome"), options.repeat),
+                "get_miss": measure(system, lambda: browsers.get("safari"), options.repeat),
+                "launch": measure(system, lambda: launch(system, inventory), options.repeat),
+                "osx_detection": measure(
+                    system, lambda: list(osx.browsers(roots=[system.applications_dir])), options.repeat
+                ),
+            }
+
+    return {
+        "pybrowsers": metadata.version("pybrowsers") if _is_installed() else None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": vars(options),
+        "results": results,
+    }
+
+
+def _is_installed() -> bool:
+    try:
+        metadata.version("pybrowsers")
+    except metadata.PackageNotFoundError:
+        return False
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--desktop-files", type=int, default=2000, help="number of desktop entries")
+    parser.add_argument("--browsers", type=int, default=8, help="number of fake browsers among the desktop entries")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds each fake browser takes for --version")
+    parser.add_argument("--output-format", choices=sorted(OUTPUT_FORMATS), default="chrome", help="--version format")
+    parser.add_argument("--bundles", type=int, default=500, help="number of application bundles for macOS detection")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs per benchmark")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    options = parser.parse_args()
+
+    if sys.platform != "linux":
+        parser.exit(1, "The synthetic benchmarks require Linux\n")
+
+    results = json.dumps(run(options), indent=2)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as f:
+            f.write(results + "\n")
+    else:
+        print(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Synthetic XDG trees with fake browser executables for benchmarking detection and launch.
+"""
+
+import os
+import plistlib
+import stat
+import sys
+from dataclasses import dataclass
+
+from browsers.osx import OSX_BROWSER_BUNDLE_LIST
+
+from .desktop_entries import LOCALES
+
+# --version output formats of real browsers, {name} and {version} are substituted
+OUTPUT_FORMATS = {
+    "chrome": "{name} {version} ",
+    "firefox": "Mozilla {name} {version}",
+    "brave": "{name} {version} beta",
+    "plain": "{version}",
+}
+
+# display names from LINUX_DESKTOP_BROWSER_NAMES and the versions printed by the fake executables
+BROWSERS = (
+    ("Google Chrome", "120.0.6099.109"),
+    ("Firefox", "124.0.2"),
+    ("Chromium", "120.0.6099.71"),
+    ("Microsoft Edge", "120.0.2210.91"),
+    ("Brave", "1.61.109"),
+    ("Opera", "106.0.4998.70"),
+    ("Vivaldi", "6.5.3206.48"),
+    ("Yandex Browser", "23.11.1.822"),
+    ("LibreWolf", "124.0.2-1"),
+    ("Waterfox", "6.0.11"),
+)
+
+EXECUTABLE = """\
+#!{python}
+import os
+import sys
+import time
+
+with open({log!r}, "a") as f:
+    f.write(" ".join(sys.argv) + os.linesep)
+if "--version" in sys.argv:
+    time.sleep({latency})
+    print({output!r})
+"""
+
+# stub of the macOS Spotlight CLI which finds the browser bundles for any query
+MDFIND = """\
+#!{python}
+import os
+import sys
+import time
+
+with open({log!r}, "a") as f:
+    f.write(" ".join(sys.argv) + os.linesep)
+time.sleep({latency})
+print({output!r}, end="")
+"""
+
+
+@dataclass
+class SyntheticSystem:
+    """
+    A synthetic system under root with $XDG_DATA_HOME/applications, $XDG_DATA_DIRS and fake browsers in bin/, and
+    for macOS detection application bundles in Applications/ and a stub mdfind in bin/.
+
+    Each fake browser and mdfind append their command line to invocations.log, which is used to count subprocesses.
+    """
+
+    root: str
+    desktop_files: int = 2000
+    browsers: int = 8
+    latency: float = 0.05
+    output_format: str = "chrome"
+    bundles: int = 500
+
+    @property
+    def data_home(self) -> str:
+        return os.path.join(self.root, "data-home")
+
+    @property
+    def data_dirs(self) -> str:
+        return os.path.join(self.root, "data-dirs")
+
+    @property
+    def bin_dir(self) -> str:
+        return os.path.join(self.root, "bin")
+
+    @property
+    def applications_dir(self) -> str:
+        return os.path.join(self.root, "Applications")
+
+    @property
+    def log(self) -> str:
+        return os.path.join(self.root, "invocations.log")
+
+    def create(self) -> None:
+        applications_dir = os.path.join(self.data_dirs, "applications")
+        os.makedirs(applications_dir, exist_ok=True)
+        os.makedirs(os.path.join(self.data_home, "applications"), exist_ok=True)
+        os.makedirs(self.bin_dir, exist_ok=True)
+
+        for i in range(self.desktop_files - self.browsers):
+            self._write(os.path.join(applications_dir, f"app-{i}.desktop"), f"Application {i}", f"app-{i}", False)
+
+        for i in range(self.browsers):
+            name, version = BROWSERS[i % len(BROWSERS)]
+            executable = os.path.join(self.bin_dir, f"browser-{i}")
+            output = OUTPUT_FORMATS[self.output_format].format(name=name, version=version)
+            with open(executable, "w", encoding="utf-8") as f:
+                f.write(EXECUTABLE.format(python=sys.executable, log=self.log, latency=self.latency, output=output))
+            os.chmod(executable, os.stat(executable).st_mode | stat.S_IEXEC)
+            self._write(os.path.join(applications_dir, f"browser-{i}.desktop"), name, executable, True)
+
+        self._create_bundles()
+
+    def environ(self) -> dict[str, str]:
+        return {
+            "XDG_DATA_HOME": self.data_home,
+            "XDG_DATA_DIRS": self.data_dirs,
+            "PATH": os.pathsep.join((self.bin_dir, os.environ.get("PATH", os.defpath))),
+        }
+
+    def invocations(self) -> int:
+        try:
+            with open(self.log, encoding="utf-8") as f:
+                return sum(1 for _ in f)
+        except FileNotFoundError:
+            return 0
+
+    def reset_invocations(self) -> None:
+        if os.path.exists(self.log):
+            os.remove(self.log)
+
+    def _create_bundles(self) -> None:
+        for i in range(self.bundles - self.browsers):
+            self._write_bundle(f"Application {i}", f"com.example.application{i}", "1.0")
+
+        app_dirs = []
+        for i in range(self.browsers):
+            browser, bundle_id, _ = OSX_BROWSER_BUNDLE_LIST[i % len(OSX_BROWSER_BUNDLE_LIST)]
+            app_dirs.append(self._write_bundle(f"{browser}-{i}", bundle_id, "120.0.6099.109"))
+
+        mdfind = os.path.join(self.bin_dir, "mdfind")
+        output = "".join(f"{app_dir}\n" for app_dir in app_dirs[::2])  # the others are only found in Applications/
+        with open(mdfind, "w", encoding="utf-8") as f:
+            f.write(MDFIND.format(python=sys.executable, log=self.log, latency=self.latency, output=output))
+        os.chmod(mdfind, os.stat(mdfind).st_mode | stat.S_IEXEC)
+
+    def _write_bundle(self, name: str, bundle_id: str, version: str) -> str:
+        app_dir = os.path.join(self.applications_dir, f"{name}.app")
+        os.makedirs(os.path.join(app_dir, "Contents", "MacOS"), exist_ok=True)
+        plist = {
+            "CFBundleIdentifier": bundle_id,
+            "CFBundleExecutable": name,
+            "CFBundleName": name,
+            "CFBundleShortVersionString": version,
+            "CFBundleVersion": version,
+            "CFBundleDocumentTypes": [{"CFBundleTypeName": f"Document {i}"} for i in range(20)],
+        }
+        with open(os.path.join(app_dir, "Contents", "Info.plist"), "wb") as f:
+            plistlib.dump(plist, f)
+        return app_dir
+
+    @staticmethod
+    def _write(path: str, name: str, executable: str, is_browser: bool) -> None:
+        categories = "Network;WebBrowser;" if is_browser else "Utility;TextEditor;"
+        lines = ["[Desktop Entry]", "Type=Application", f"Name={name}", f"Exec={executable} %U"]
+        lines += [f"Categories={categories}"]
+        lines += [f"Name[{locale}]={name} ({locale})" for locale in LOCALES]
+        lines += ["", "[Desktop Action new-window]", "Name=New Window", f"Exec={executable} --new-window"]
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
@@ -1,30 +1,153 @@
-import fnmatch
+import contextlib
+import importlib
 import logging
 import subprocess
 import sys
-from collections.abc import Iterator, Sequence
+import time
+from collections.abc import Generator, Iterable, Sequence
+from typing import TYPE_CHECKING, Any, Literal, TypeVar, overload
 
-from . import linux, osx, windows
-from .common import Browser
+from .common import Browser, BrowserRecord, launch_command
+from .deadline import UNKNOWN_VERSION, UNRESOLVED_VERSIONS, Deadline
+from .query import BrowserIndex, Order, matches
 
-__all__ = ["Browser", "browsers", "get", "launch"]
+if TYPE_CHECKING:
+    from .aio import async_browsers, async_get, async_launch
+    from .inventory import Inventory, shared_inventory
+    from .pool import BrowserPool
+    from .readiness import LaunchHandle
+    from .resources import ResourceLimits
+    from .roots import scan_roots
+
+__all__ = [
+    "Browser",
+    "BrowserPool",
+    "BrowserRecord",
+    "Deadline",
+    "Inventory",
+    "LaunchHandle",
+    "ResourceLimits",
+    "UNKNOWN_VERSION",
+    "async_browsers",
+    "async_get",
+    "async_launch",
+    "browsers",
+    "find",
+    "get",
+    "launch",
+    "launch_batches",
+    "scan_roots",
+    "select",
+    "shared_inventory",
+]
 
-logging.basicConfig(stream=sys.stdout, level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger(__name__)
 
+# attributes whose modules (and their imports, e.g. asyncio or urllib.request) are only loaded when first accessed
+_LAZY_ATTRIBUTES = {
+    "async_browsers": "aio",
+    "async_get": "aio",
+    "async_launch": "aio",
+    "BrowserPool": "pool",
+    "Inventory": "inventory",
+    "shared_inventory": "inventory",
+    "LaunchHandle": "readiness",
+    "ResourceLimits": "resources",
+    "scan_roots": "roots",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if module := _LAZY_ATTRIBUTES.get(name):
+        return getattr(importlib.import_module(f".{module}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_LAZY_ATTRIBUTES})
+
+
+_B = TypeVar("_B", Browser, BrowserRecord)
+
+
+@overload
+def browsers(
+    browser_type: str | None = None,
+    cache: bool = False,
+    max_workers: int | None = None,
+    ordered: bool = True,
+    lazy: Literal[False] = False,
+    deadline: float | Deadline | None = None,
+    root: str | None = None,
+) -> Generator[Browser, None, None]: ...
 
-def browsers() -> Iterator[Browser]:
+
+@overload
+def browsers(
+    browser_type: str | None = None,
+    cache: bool = False,
+    max_workers: int | None = None,
+    ordered: bool = True,
+    *,
+    lazy: Literal[True],
+    deadline: float | Deadline | None = None,
+    root: str | None = None,
+) -> Generator[BrowserRecord, None, None]: ...
+
+
+def browsers(
+    browser_type: str | None = None,
+    cache: bool = False,
+    max_workers: int | None = None,
+    ordered: bool = True,
+    lazy: bool = False,
+    deadline: float | Deadline | None = None,
+    root: str | None = None,
+) -> Generator[Browser | BrowserRecord, None, None]:
     """
     Iterates over installed browsers.
 
+    :param browser_type: Only yield browsers of this type. Other browsers are skipped before their version is read.
+    :param cache: Use the persistent detection cache on Linux (see browsers.cache).
+    :param max_workers: Maximum number of concurrent version probes on Linux.
+    :param ordered: If False, yield browsers on Linux as soon as their version is known instead of in discovery order.
+                    Closing the iterator kills the version probes which are still running.
+    :param lazy: Yield BrowserRecords whose version is only read (or probed on Linux) when it is first accessed.
+    :param deadline: Overall time budget in seconds (or a Deadline) for the version probes on Linux and the Spotlight
+                     queries on macOS. Versions which were not resolved in time are UNKNOWN_VERSION, pass a Deadline
+                     to find out which candidates timed out.
+    :param root: Scan the Linux root filesystem mounted at this directory (e.g. a container or VM image) instead of the
+                 running system, on any platform. Paths are resolved inside the root and nothing is executed, so
+                 versions are only read from the installation files (see browsers.roots).
     :return: Iterator of Tuple of browser key and browser information.
     """
-    if sys.platform == "linux":
-        yield from linux.browsers()
+    deadline = Deadline.of(deadline)
+    if root is not None:
+        from . import linux
+
+        found = linux.root_browsers(root, browser_type=browser_type)
+        yield from (BrowserRecord.from_browser(b) for b in found) if lazy else found
+    elif lazy:
+        if sys.platform == "linux":
+            from . import linux
+
+            yield from linux.browser_records(browser_type=browser_type, cache=cache, deadline=deadline)
+        else:  # versions are read from the application bundle or the registry without starting the browser
+            yield from (BrowserRecord.from_browser(b) for b in browsers(browser_type=browser_type, deadline=deadline))
+    elif sys.platform == "linux":
+        from . import linux
+
+        yield from linux.browsers(
+            browser_type=browser_type, cache=cache, max_workers=max_workers, ordered=ordered, deadline=deadline
+        )
     elif sys.platform == "win32":
-        yield from windows.browsers()
+        from . import windows
+
+        yield from windows.browsers(browser_type=browser_type)
     elif sys.platform == "darwin":
-        yield from osx.browsers()
+        from . import osx
+
+        yield from osx.browsers(browser_type=browser_type, deadline=deadline)
     else:  # pragma: no cover
         logger.info(
             "'%s' is currently not supported. Please open an issue or a PR at '%s'",
@@ -33,60 +156,295 @@ def browsers() -> Iterator[Browser]:
         )
 
 
-def get(browser: str, version: str = "*") -> Browser | None:
+@overload
+def get(
+    browser: str,
+    version: str = "*",
+    cache: bool = False,
+    inventory: "Inventory | None" = None,
+    lazy: Literal[False] = False,
+    deadline: float | Deadline | None = None,
+) -> Browser | None: ...
+
+
+@overload
+def get(
+    browser: str,
+    version: str = "*",
+    cache: bool = False,
+    inventory: "Inventory | None" = None,
+    *,
+    lazy: Literal[True],
+    deadline: float | Deadline | None = None,
+) -> BrowserRecord | None: ...
+
+
+def get(
+    browser: str,
+    version: str = "*",
+    cache: bool = False,
+    inventory: "Inventory | None" = None,
+    lazy: bool = False,
+    deadline: float | Deadline | None = None,
+) -> Browser | BrowserRecord | None:
     """
     Returns the information for the provided browser key.
 
+    Without an inventory, the first matching browser whose version probe succeeds is returned and the remaining
+    version probes are killed, so the lookup does not wait for slower browsers. A browser whose version could not be
+    resolved is only returned if no other browser of the type resolves.
+
     :param browser: Any of "chrome", "chrome-canary", "firefox", "firefox-developer", "firefox-nightly", "opera", ...
                     see LINUX_DESKTOP_ENTRY_LIST, OSX_BROWSER_BUNDLE_LIST and WINDOWS_REGISTRY_BROWSER_NAMES for values
-    :param version: Version string (supports wildcard, e.g. 100.*)
+    :param version: Version specification (supports wildcard, e.g. 100.*, and ranges, e.g. >=120,<130)
+    :param cache: Use the persistent detection cache on Linux (see browsers.cache).
+    :param inventory: Look up the browser in a memoized inventory (e.g. shared_inventory()) instead of scanning.
+    :param lazy: Return a BrowserRecord. Its version is only resolved if the version specification is not "*" or when
+                 it is accessed.
+    :param deadline: Time budget in seconds (or a Deadline) of the scan, see browsers(). A browser whose version was
+                     not resolved in time is returned with the version UNKNOWN_VERSION for the specification "*".
     :return: Dictionary containing "path", "display_name" and "version".
     """
-    for b in browsers():
-        if b["browser_type"] == browser and fnmatch.fnmatch(b["version"], version):
+    if inventory is not None:
+        found = _first_match(inventory.browsers(), browser, version)
+        return BrowserRecord.from_browser(found) if lazy and found is not None else found
+
+    if lazy:
+        with contextlib.closing(browsers(browser_type=browser, cache=cache, lazy=True, deadline=deadline)) as records:
+            return _first_match(records, browser, version, lazy=True)
+
+    with contextlib.closing(
+        browsers(browser_type=browser, cache=cache, ordered=False, deadline=deadline)
+    ) as candidates:
+        return _first_match(candidates, browser, version)
+
+
+def _first_match(candidates: Iterable[_B], browser: str, version: str, lazy: bool = False) -> _B | None:
+    """
+    Returns the first candidate matching the version specification. For "*", a candidate whose version is unresolved
+    (e.g. its probe failed, which is usually faster than a successful probe) is only returned if no other candidate
+    resolves. The versions of lazy records are not resolved for "*".
+    """
+    unresolved = None
+    for b in candidates:
+        if b["browser_type"] != browser:
+            continue
+        if version != "*":
+            if matches(b, version):
+                return b
+        elif lazy or b["version"] not in UNRESOLVED_VERSIONS:
             return b
-    return None
+        elif unresolved is None:
+            unresolved = b
+    return unresolved
+
 
+def find(
+    browser: str, version: str = "*", order: Order = "newest", inventory: "Inventory | None" = None
+) -> list[Browser]:
+    """
+    Returns all installed browsers of a type whose version matches, sorted by version.
+
+    :param browser: Browser key.
+    :param version: Version specification, e.g. "100.*", ">=120,<130" or "~=121.0".
+    :param order: "newest" or "oldest" first.
+    :param inventory: Use the index of a memoized inventory (e.g. shared_inventory()) instead of scanning.
+    """
+    index = inventory.index() if inventory is not None else BrowserIndex(browsers(browser_type=browser))
+    return index.find(browser, version, order)
 
+
+def select(
+    browser: str, version: str = "*", order: Order = "newest", inventory: "Inventory | None" = None
+) -> Browser | None:
+    """
+    Returns the newest (or oldest) installed browser of a type whose version matches.
+
+    :param browser: Browser key.
+    :param version: Version specification, e.g. "100.*", ">=120,<130" or "~=121.0".
+    :param order: "newest" or "oldest".
+    :param inventory: Use the index of a memoized inventory (e.g. shared_inventory()) instead of scanning.
+    """
+    found = find(browser, version, order, inventory)
+    return found[0] if found else None
+
+
+@overload
 def launch(
-    browser: str, version: str = "*", url: str | None = None, args: Sequence[str] | None = None
-) -> subprocess.Popen | None:
+    browser: str,
+    version: str = "*",
+    url: str | Sequence[str] | None = None,
+    args: Sequence[str] | None = None,
+    inventory: "Inventory | None" = None,
+    *,
+    ready: Literal[False] = False,
+    ready_timeout: float = 30,
+    new_window: bool = False,
+    limits: "ResourceLimits | None" = None,
+    ephemeral_profile: Literal[False] = False,
+    deadline: float | Deadline | None = None,
+) -> subprocess.Popen | None: ...
+
+
+@overload
+def launch(
+    browser: str,
+    version: str = "*",
+    url: str | Sequence[str] | None = None,
+    args: Sequence[str] | None = None,
+    inventory: "Inventory | None" = None,
+    *,
+    ready: Literal[True],
+    ready_timeout: float = 30,
+    new_window: bool = False,
+    limits: "ResourceLimits | None" = None,
+    ephemeral_profile: str | bool = False,
+    deadline: float | Deadline | None = None,
+) -> "LaunchHandle | None": ...
+
+
+@overload
+def launch(
+    browser: str,
+    version: str = "*",
+    url: str | Sequence[str] | None = None,
+    args: Sequence[str] | None = None,
+    inventory: "Inventory | None" = None,
+    *,
+    ready: bool = False,
+    ready_timeout: float = 30,
+    new_window: bool = False,
+    limits: "ResourceLimits | None" = None,
+    ephemeral_profile: str | Literal[True],
+    deadline: float | Deadline | None = None,
+) -> "LaunchHandle | None": ...
+
+
+def launch(
+    browser: str,
+    version: str = "*",
+    url: str | Sequence[str] | None = None,
+    args: Sequence[str] | None = None,
+    inventory: "Inventory | None" = None,
+    *,
+    ready: bool = False,
+    ready_timeout: float = 30,
+    new_window: bool = False,
+    limits: "ResourceLimits | None" = None,
+    ephemeral_profile: str | bool = False,
+    deadline: float | Deadline | None = None,
+) -> "subprocess.Popen | LaunchHandle | None":
     """
     Launches a web browser.
 
     :param browser: Browser key.
-    :param version: Version string (supports wildcard, e.g. 100.*)
-    :param url: URL.
+    :param version: Version specification (supports wildcard, e.g. 100.*, and ranges, e.g. >=120,<130)
+    :param url: URL or URLs, which are all opened by the same process (see launch_batches() to split them).
     :param args: Arguments to be passed to the browser.
+    :param inventory: Look up the browser in a memoized inventory (e.g. shared_inventory()) instead of scanning.
+    :param ready: Enable remote debugging (unless --remote-debugging-port is in args), wait until the browser answers
+                  on its port and return a LaunchHandle with the startup time.
+    :param ready_timeout: Seconds to wait for the browser to be ready before it is killed and TimeoutError is raised.
+    :param new_window: Open the URLs in a new window instead of new tabs of a running browser.
+    :param limits: CPU affinity, niceness, I/O priority, rlimits and cgroup applied to the browser process tree.
+    :param ephemeral_profile: Run the browser with a new profile in browsers.profiles.PROFILE_ROOT (tmpfs if available)
+                              which is removed when the browser exits. True creates an empty profile, a path clones
+                              a template profile. A LaunchHandle with the profile creation time is returned.
+    :param deadline: Time budget in seconds (or a Deadline) for finding the browser, see get().
     """
     if args is None:
         args = []
 
-    if b := get(browser, version):
-        return _launch(browser, b["path"], args, url)
+    options: dict[str, Any] = {}
+    if new_window:
+        options["new_window"] = True
+    if limits is not None:
+        options["limits"] = limits
 
-    logger.info("Cannot find browser '%s'", browser)
-    return None
+    if not (b := get(browser, version, inventory=inventory, deadline=deadline)):
+        logger.info("Cannot find browser '%s'", browser)
+        return None
 
+    if ephemeral_profile is False:
+        if ready:
+            from .readiness import launch_ready
 
-def _launch(
-    browser: str, path: str, args: Sequence[str], url: str | None = None
-) -> subprocess.Popen:  # pragma: no cover
-    url_arg = []
+            return launch_ready(browser, b["path"], args, url, ready_timeout, **options)
+        return _launch(browser, b["path"], args, url, **options)
+
+    from .profiles import create_profile, profile_args, remove_when_exited
+    from .readiness import LaunchHandle, launch_ready
 
-    if browser == "firefox" and url is not None:  # NOTE: this does not happen on firefox-developer and firefox-nightly
-        if args:
-            args = (*args, url)
+    profile_args(browser, args, "")  # fail before creating the profile
+    profile = create_profile(None if ephemeral_profile is True else ephemeral_profile)
+    profile_flags = profile_args(browser, args, profile.path)
+    try:
+        if ready:
+            handle = launch_ready(browser, b["path"], [*args, *profile_flags], url, ready_timeout, **options)
         else:
-            args = ("-new-tab", url)
-    elif url is not None:
-        url_arg.append(url)
-
-    if browser.startswith("safari"):
-        if args:
-            logger.warning("Safari does not accept command line arguments. %s will be ignored.", str(args))
-        command = ["open", "--wait-apps", "--new", "--fresh", "-a", path, *url_arg]
-    else:
-        command = [path, *url_arg, *args]
-
-    return subprocess.Popen(command)
+            spawned_at = time.monotonic()
+            handle = LaunchHandle(_launch(browser, b["path"], [*args, *profile_flags], url, **options), spawned_at)
+    except BaseException:
+        profile.remove()
+        raise
+
+    handle.profile = profile.path
+    handle.profile_time = profile.creation_time
+    remove_when_exited(handle.process, profile)
+    return handle
+
+
+def launch_batches(
+    browser: str,
+    urls: Sequence[str],
+    batch_size: int,
+    version: str = "*",
+    args: Sequence[str] | None = None,
+    inventory: "Inventory | None" = None,
+    new_window: bool = False,
+    limits: "ResourceLimits | None" = None,
+) -> list[subprocess.Popen]:
+    """
+    Opens URLs with one process per batch of batch_size URLs, e.g. to stay below command line length limits.
+
+    Most browsers hand the URLs of later processes over to the first one, which opens them as tabs (or windows).
+
+    :param browser: Browser key.
+    :param urls: URLs to open.
+    :param batch_size: Maximum number of URLs passed to one process.
+    :param version: Version specification (supports wildcard, e.g. 100.*, and ranges, e.g. >=120,<130)
+    :param args: Arguments to be passed to every process.
+    :param inventory: Look up the browser in a memoized inventory (e.g. shared_inventory()) instead of scanning.
+    :param new_window: Open every batch in a new window.
+    :param limits: Resource controls applied to every process.
+    :return: The launched processes, empty if the browser was not found.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    if isinstance(urls, str):
+        urls = [urls]
+
+    if not (b := get(browser, version, inventory=inventory)):
+        logger.info("Cannot find browser '%s'", browser)
+        return []
+
+    return [
+        _launch(browser, b["path"], args or [], urls[i : i + batch_size], new_window=new_window, limits=limits)
+        for i in range(0, len(urls), batch_size)
+    ]
+
+
+def _launch(
+    browser: str,
+    path: str,
+    args: Sequence[str],
+    url: str | Sequence[str] | None = None,
+    new_window: bool = False,
+    limits: "ResourceLimits | None" = None,
+    **kwargs: Any,
+) -> subprocess.Popen:  # pragma: no cover
+    command = launch_command(browser, path, args, url, new_window)
+    if limits is not None:
+        command = limits.command(command)
+        kwargs["preexec_fn"] = limits.preexec_fn()
+    return subprocess.Popen(command, **kwargs)
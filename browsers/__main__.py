@@ -0,0 +1,30 @@
+import argparse
+import logging
+import signal
+import sys
+
+from . import daemon
+from .inventory import Inventory
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m browsers", description="Python library for detecting browsers")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve = subparsers.add_parser("serve", help="answer browsers() and get() queries over a Unix domain socket")
+    serve.add_argument("--socket", help=f"socket path (default: {daemon.socket_path()})")
+    serve.add_argument("--ttl", type=float, help="rescan after this many seconds (default: never)")
+
+    options = parser.parse_args()
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if options.command == "serve":
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))  # remove the socket on termination
+        try:
+            daemon.serve(options.socket, Inventory(ttl=options.ttl))
+        except OSError as e:
+            parser.exit(1, f"{e}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import sys
+from collections.abc import AsyncGenerator, Sequence
+
+from .common import Browser, launch_command
+from .deadline import UNRESOLVED_VERSIONS
+from .query import matches
+from .resources import ResourceLimits
+
+logger = logging.getLogger(__name__)
+
+
+async def async_browsers(browser_type: str | None = None, cache: bool = False) -> AsyncGenerator[Browser, None]:
+    """
+    Iterates over installed browsers without blocking the event loop.
+
+    Browsers are yielded as soon as they are resolved so the order may differ from browsers().
+
+    :param browser_type: Only probe and yield browsers of this type.
+    :param cache: Use the persistent detection cache on Linux (see browsers.cache).
+    :return: Async iterator of browser information.
+    """
+    if sys.platform == "linux":
+        from . import linux
+
+        async for b in linux.async_browsers(browser_type=browser_type, cache=cache):
+            yield b
+    elif sys.platform == "win32":
+        from . import windows
+
+        for b in await asyncio.to_thread(list, windows.browsers(browser_type=browser_type)):
+            yield b
+    elif sys.platform == "darwin":
+        from . import osx
+
+        async for b in osx.async_browsers(browser_type=browser_type):
+            yield b
+    else:  # pragma: no cover
+        logger.info(
+            "'%s' is currently not supported. Please open an issue or a PR at '%s'",
+            sys.platform,
+            "https://github.com/roniemartinez/browsers",
+        )
+
+
+async def async_get(browser: str, version: str = "*", cache: bool = False) -> Browser | None:
+    """
+    Returns the information for the provided browser key without blocking the event loop.
+
+    Pending version probes are cancelled as soon as a matching browser is found. A browser whose version could not be
+    resolved is only returned if no other browser of the type resolves.
+
+    :param browser: Browser key.
+    :param version: Version specification (supports wildcard, e.g. 100.*, and ranges, e.g. >=120,<130)
+    :param cache: Use the persistent detection cache on Linux (see browsers.cache).
+    :return: Dictionary containing "path", "display_name" and "version".
+    """
+    unresolved = None
+    iterator = async_browsers(browser_type=browser, cache=cache)
+    try:
+        async for b in iterator:
+            if b["browser_type"] != browser or not matches(b, version):
+                continue
+            if version != "*" or b["version"] not in UNRESOLVED_VERSIONS:
+                return b
+            if unresolved is None:
+                unresolved = b
+    finally:
+        await iterator.aclose()
+    return unresolved
+
+
+async def async_launch(
+    browser: str,
+    version: str = "*",
+    url: str | Sequence[str] | None = None,
+    args: Sequence[str] | None = None,
+    new_window: bool = False,
+    limits: ResourceLimits | None = None,
+) -> asyncio.subprocess.Process | None:
+    """
+    Launches a web browser without blocking the event loop.
+
+    :param browser: Browser key.
+    :param version: Version string (supports wildcard, e.g. 100.*)
+    :param url: URL or URLs, which are all opened by the same process.
+    :param args: Arguments to be passed to the browser.
+    :param new_window: Open the URLs in a new window instead of new tabs of a running browser.
+    :param limits: CPU affinity, niceness, I/O priority, rlimits and cgroup applied to the browser process tree.
+    :return: asyncio Process of the launched browser.
+    """
+    if args is None:
+        args = []
+
+    if b := await async_get(browser, version):
+        command = launch_command(browser, b["path"], args, url, new_window)
+        if limits is not None:
+            return await asyncio.create_subprocess_exec(*limits.command(command), preexec_fn=limits.preexec_fn())
+        return await asyncio.create_subprocess_exec(*command)
+
+    logger.info("Cannot find browser '%s'", browser)
+    return None
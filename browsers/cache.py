@@ -0,0 +1,129 @@
+import contextlib
+import json
+import os
+import tempfile
+
+from .common import Browser
+from .versions import package_metadata_path
+
+CACHE_VERSION = 1
+
+Fingerprint = list[int]
+
+
+def cache_path() -> str:
+    """
+    Returns the location of the detection cache, `$XDG_CACHE_HOME/pybrowsers/linux.json`.
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(cache_home, "pybrowsers", "linux.json")
+
+
+def clear() -> None:
+    """
+    Invalidates the detection cache by removing it from disk.
+    """
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(cache_path())
+
+
+def fingerprint(path: str) -> Fingerprint | None:
+    """
+    Returns the inode, size and modification time of a file (following symlinks) or None if it does not exist.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+
+def executable_fingerprint(path: str) -> Fingerprint | None:
+    """
+    Returns the fingerprint of an executable, or of the package metadata for the launchers of snaps and Flatpak apps.
+    """
+    return fingerprint(package_metadata_path(path) or path)
+
+
+class DetectionCache:
+    """
+    Maps desktop files to detected browsers.
+
+    An entry is only valid while the desktop file and the executable it resolved to (or the metadata of its package)
+    are unchanged.
+    Desktop files which are not browsers are stored as well (without an executable) so they are not parsed again.
+    """
+
+    def __init__(self, path: str, entries: dict[str, dict] | None = None) -> None:
+        self.path = path
+        self.entries = entries or {}
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: str | None = None) -> "DetectionCache":
+        path = path or cache_path()
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return cls(path)
+
+        return cls(path, data.get("entries"))
+
+    def lookup(self, desktop_file: str, desktop_fingerprint: Fingerprint | None) -> tuple[bool, Browser | None]:
+        """
+        Returns a tuple of (hit, browser). The browser is None on a hit for a desktop file which is not a browser.
+        """
+        entry = self.entries.get(desktop_file)
+        if entry is None or desktop_fingerprint is None or entry["desktop"] != desktop_fingerprint:
+            return False, None
+
+        browser = entry["browser"]
+        if browser is not None and executable_fingerprint(browser["path"]) != entry["executable"]:
+            return False, None
+
+        return True, browser
+
+    def store(self, desktop_file: str, desktop_fingerprint: Fingerprint | None, browser: Browser | None) -> None:
+        if desktop_fingerprint is None:
+            return
+
+        executable = None
+        if browser is not None and (executable := executable_fingerprint(browser["path"])) is None:
+            return
+
+        self.entries[desktop_file] = {
+            "desktop": desktop_fingerprint,
+            "executable": executable,
+            "browser": browser,
+        }
+        self.dirty = True
+
+    def save(self) -> None:
+        """
+        Atomically replaces the cache file so concurrent readers and writers always see a complete cache.
+        """
+        if not self.dirty:
+            return
+
+        entries = {desktop_file: entry for desktop_file, entry in self.entries.items() if os.path.exists(desktop_file)}
+        directory = os.path.dirname(self.path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        except OSError:
+            return
+
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": CACHE_VERSION, "entries": entries}, f)
+            os.replace(temp_path, self.path)
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+            return
+
+        self.dirty = False
@@ -1,8 +1,239 @@
-from typing import TypedDict
+import contextlib
+import logging
+import os
+import signal
+import subprocess
+import sys
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from typing import Any, TypedDict
 
+logger = logging.getLogger(__name__)
 
-class Browser(TypedDict):
+BROWSER_FAMILIES = {
+    "chromium": (
+        "brave",
+        "chrome",
+        "chromium",
+        "epic",
+        "msedge",
+        "opera",
+        "ungoogled-chromium",
+        "vivaldi",
+        "yandex",
+    ),
+    "gecko": ("basilisk", "firefox", "floorp", "librewolf", "pale-moon", "waterfox", "zen"),
+}
+
+
+class _BrowserRequiredKeys(TypedDict):
     browser_type: str
     path: str
     display_name: str
     version: str
+
+
+class Browser(_BrowserRequiredKeys, total=False):
+    packaging: str  # "snap" or "flatpak" for sandboxed packages on Linux, missing for native installations
+
+
+class BrowserRecord(Mapping[str, str]):
+    """
+    An immutable browser with the keys of Browser, whose version is resolved when it is first accessed.
+
+    Records use __slots__ instead of a dict per browser and compare equal to the Browser with the same items.
+
+    >>> record = BrowserRecord("firefox", "/usr/bin/firefox", "Firefox Web Browser", lambda: "120.0")
+    >>> record
+    BrowserRecord(browser_type='firefox', path='/usr/bin/firefox', display_name='Firefox Web Browser', version=...)
+    >>> record["version"], record.resolved
+    ('120.0', True)
+
+    :param version: The version, or a function returning it which is called once, on first access. Concurrent first
+                    accesses may call it more than once.
+    """
+
+    __slots__ = ("browser_type", "path", "display_name", "packaging", "_version", "_resolve")
+
+    browser_type: str
+    path: str
+    display_name: str
+    packaging: str | None
+    _version: str | None
+    _resolve: Callable[[], str] | None
+
+    def __init__(
+        self,
+        browser_type: str,
+        path: str,
+        display_name: str,
+        version: str | Callable[[], str],
+        packaging: str | None = None,
+    ) -> None:
+        setattr_ = object.__setattr__
+        setattr_(self, "browser_type", browser_type)
+        setattr_(self, "path", path)
+        setattr_(self, "display_name", display_name)
+        setattr_(self, "packaging", packaging)
+        setattr_(self, "_version", version if isinstance(version, str) else None)
+        setattr_(self, "_resolve", None if isinstance(version, str) else version)
+
+    @classmethod
+    def from_browser(cls, browser: Browser) -> "BrowserRecord":
+        return cls(
+            browser["browser_type"],
+            browser["path"],
+            browser["display_name"],
+            browser["version"],
+            browser.get("packaging"),
+        )
+
+    @property
+    def version(self) -> str:
+        resolve = self._resolve  # read once, another thread may clear it after resolving
+        if self._version is None and resolve is not None:
+            object.__setattr__(self, "_version", resolve())
+            object.__setattr__(self, "_resolve", None)  # releases the probe's references
+        return self._version or ""
+
+    @property
+    def resolved(self) -> bool:
+        """
+        Whether the version is known without running the resolver.
+        """
+        return self._resolve is None
+
+    def to_browser(self) -> Browser:
+        """
+        Returns the record as a Browser dict, resolving the version.
+        """
+        return Browser(**self)  # type: ignore[typeddict-item]
+
+    def __getitem__(self, key: str) -> str:
+        if key in _RECORD_KEYS or (key == "packaging" and self.packaging is not None):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:  # without resolving the version
+        return key in _RECORD_KEYS or (key == "packaging" and self.packaging is not None)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from _RECORD_KEYS
+        if self.packaging is not None:
+            yield "packaging"
+
+    def __len__(self) -> int:
+        return len(_RECORD_KEYS) + (self.packaging is not None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return type(self), (self.browser_type, self.path, self.display_name, self.version, self.packaging)
+
+    def __repr__(self) -> str:
+        version = repr(self._version) if self.resolved else "..."
+        packaging = f", packaging={self.packaging!r}" if self.packaging is not None else ""
+        return (
+            f"{type(self).__name__}(browser_type={self.browser_type!r}, path={self.path!r}, "
+            f"display_name={self.display_name!r}, version={version}{packaging})"
+        )
+
+
+_RECORD_KEYS = ("browser_type", "path", "display_name", "version")
+
+
+def browser_family(browser: str) -> str | None:
+    """
+    Returns the engine family sharing command line flags with the browser, if known.
+
+    >>> browser_family("chrome-canary"), browser_family("firefox-developer"), browser_family("safari")
+    ('chromium', 'gecko', None)
+    """
+    for family, browsers in BROWSER_FAMILIES.items():
+        for name in browsers:
+            if browser == name or browser.startswith(f"{name}-"):
+                return family
+    return None
+
+
+def launch_command(
+    browser: str, path: str, args: Sequence[str], url: str | Sequence[str] | None = None, new_window: bool = False
+) -> list[str]:
+    """
+    Builds the command line used to launch a browser. Several URLs are opened by the same process.
+
+    >>> launch_command("chrome", "/usr/bin/google-chrome", ["--incognito"], "https://example.com")
+    ['/usr/bin/google-chrome', 'https://example.com', '--incognito']
+    >>> launch_command("chrome", "/usr/bin/google-chrome", [], ["https://a.com", "https://b.com"], new_window=True)
+    ['/usr/bin/google-chrome', 'https://a.com', 'https://b.com', '--new-window']
+    >>> launch_command("firefox", "/usr/bin/firefox", [], ["https://a.com", "https://b.com"])
+    ['/usr/bin/firefox', '-new-tab', 'https://a.com', '-new-tab', 'https://b.com']
+
+    :param url: URL or URLs to open, as tabs of one window.
+    :param new_window: Open the URLs in a new window instead of the current window of a running browser.
+    """
+    urls = [url] if isinstance(url, str) else list(url or ())
+    url_arg = []
+    family = browser_family(browser)
+
+    # NOTE: a single URL is only passed with -new-tab to firefox, not to firefox-developer and firefox-nightly
+    if family == "gecko" and (browser == "firefox" or len(urls) > 1 or new_window):
+        args = (*args, *_gecko_url_args(urls, new_window, bool(args)))
+    else:
+        url_arg.extend(urls)
+        if new_window and family == "chromium":
+            args = (*args, "--new-window")
+
+    if browser.startswith("safari"):
+        if args:
+            logger.warning("Safari does not accept command line arguments. %s will be ignored.", str(args))
+        return ["open", "--wait-apps", "--new", "--fresh", "-a", path, *url_arg]
+
+    return [path, *url_arg, *args]
+
+
+def _gecko_url_args(urls: list[str], new_window: bool, has_args: bool) -> list[str]:
+    """
+    URLs are passed with -new-tab (or -new-window for the first one), or as they are after other arguments so
+    arguments which take an optional URL (e.g. --private-window) receive it.
+
+    >>> _gecko_url_args(["https://a.com", "https://b.com"], True, False)
+    ['-new-window', 'https://a.com', '-new-tab', 'https://b.com']
+    >>> _gecko_url_args(["https://a.com", "https://b.com"], False, True)
+    ['https://a.com', 'https://b.com']
+    """
+    if has_args and not new_window:
+        return urls
+    return [arg for i, url in enumerate(urls) for arg in ("-new-window" if new_window and i == 0 else "-new-tab", url)]
+
+
+def new_process_group() -> dict[str, Any]:
+    """
+    Returns the subprocess.Popen arguments which start a process in its own process group.
+    """
+    if sys.platform == "win32":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def terminate_process_group(process: subprocess.Popen, timeout: float = 5) -> None:
+    """
+    Terminates a process started with new_process_group() together with its children (e.g. renderer processes).
+    The processes are killed if they did not exit after timeout seconds.
+    """
+    if sys.platform == "win32":
+        subprocess.run(["taskkill", "/T", "/F", "/PID", str(process.pid)], capture_output=True)
+        process.wait()
+        return
+
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        with contextlib.suppress(ProcessLookupError):
+            os.killpg(process.pid, sig)
+        try:
+            process.wait(timeout)
+            return
+        except subprocess.TimeoutExpired:
+            continue
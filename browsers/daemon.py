@@ -0,0 +1,245 @@
+"""
+A daemon which scans the system once and answers browsers() and get() queries over a Unix domain socket.
+
+Start it with ``python -m browsers serve`` and use browsers() and get() of this module, which fall back to a direct
+scan when no daemon is running.
+
+The wire format is one JSON object per line in each direction, e.g. ``{"op":"get","browser":"chrome","version":"*"}``
+is answered with ``{"browsers":[["chrome","/usr/bin/google-chrome","Google Chrome","120.0.6099.109"]]}``. Browsers are
+sent as lists of FIELDS (without missing optional fields at the end) and errors as ``{"error":"..."}``.
+"""
+
+import contextlib
+import io
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+import sys
+import tempfile
+from types import TracebackType
+from typing import Any
+
+from .common import Browser
+from .inventory import Inventory
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("browser_type", "path", "display_name", "version", "packaging")
+
+CLIENT_TIMEOUT = 5
+
+
+def socket_path() -> str:
+    """
+    Returns $XDG_RUNTIME_DIR/pybrowsers.sock, or a per-user socket in the temporary directory if it is not set.
+    """
+    if runtime_dir := os.environ.get("XDG_RUNTIME_DIR"):
+        return os.path.join(runtime_dir, "pybrowsers.sock")
+    return os.path.join(tempfile.gettempdir(), f"pybrowsers-{os.getuid() if hasattr(os, 'getuid') else 0}.sock")
+
+
+def browsers(browser_type: str | None = None, path: str | None = None) -> list[Browser]:
+    """
+    Returns the installed browsers known to the daemon, or scans the system if no daemon is running.
+
+    :param browser_type: Only return browsers of this type.
+    :param path: Socket path, defaults to socket_path().
+    """
+    try:
+        with Client(path) as client:
+            return client.browsers(browser_type)
+    except OSError:
+        from . import browsers as scan
+
+        return list(scan(browser_type=browser_type))
+
+
+def get(browser: str, version: str = "*", path: str | None = None) -> Browser | None:
+    """
+    Returns the first installed browser matching the version specification known to the daemon, or scans the system
+    if no daemon is running.
+
+    :param browser: Browser key.
+    :param version: Version specification (supports wildcard, e.g. 100.*, and ranges, e.g. >=120,<130)
+    :param path: Socket path, defaults to socket_path().
+    """
+    try:
+        with Client(path) as client:
+            return client.get(browser, version)
+    except OSError:
+        from . import get as scan
+
+        return scan(browser, version)
+
+
+class Client:
+    """
+    A connection to the daemon which can be used for several queries.
+
+    :raises OSError: No daemon is listening on the socket, or it is not owned by the current user.
+    :raises ValueError: The daemon rejected a query, e.g. because of an invalid version specification.
+    """
+
+    _socket: socket.socket
+    _file: io.BufferedRWPair
+
+    def __init__(self, path: str | None = None, timeout: float = CLIENT_TIMEOUT) -> None:
+        if sys.platform == "win32":
+            raise OSError("Unix domain sockets are not supported on Windows")
+
+        path = path or socket_path()
+        # the socket may be in the shared temporary directory, where any user could bind it first
+        status = os.lstat(path)
+        if not stat.S_ISSOCK(status.st_mode) or status.st_uid != os.getuid():
+            raise OSError(f"{path} is not a socket of the current user")
+
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        try:
+            self._socket.connect(path)
+        except OSError:
+            self._socket.close()
+            raise
+        self._file = self._socket.makefile("rwb")
+
+    def browsers(self, browser_type: str | None = None) -> list[Browser]:
+        return self._request({"op": "browsers", "browser_type": browser_type})
+
+    def get(self, browser: str, version: str = "*") -> Browser | None:
+        found = self._request({"op": "get", "browser": browser, "version": version})
+        return found[0] if found else None
+
+    def refresh(self) -> list[Browser]:
+        """
+        Makes the daemon rescan the system.
+        """
+        return self._request({"op": "refresh"})
+
+    def close(self) -> None:
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc_val: BaseException | None, exc_tb: TracebackType | None
+    ) -> None:
+        self.close()
+
+    def _request(self, request: dict[str, Any]) -> list[Browser]:
+        self._file.write(_encode(request))
+        self._file.flush()
+        if not (line := self._file.readline()):
+            raise ConnectionError("The daemon closed the connection")
+
+        response = json.loads(line)
+        if "error" in response:
+            raise ValueError(response["error"])
+        return [_unpack(values) for values in response["browsers"]]
+
+
+def serve(path: str | None = None, inventory: Inventory | None = None) -> None:
+    """
+    Scans the system and answers queries until interrupted.
+
+    :param path: Socket path, defaults to socket_path().
+    :param inventory: Inventory to serve, e.g. with a ttl so the daemon rescans periodically.
+    :raises OSError: Another daemon is listening on the socket.
+    """
+    inventory = inventory or Inventory()
+    with make_server(path, inventory) as server:
+        logger.info("Serving %d browsers on %s", len(inventory.browsers()), server.server_address)
+        with contextlib.suppress(KeyboardInterrupt):
+            server.serve_forever()
+
+
+def make_server(path: str | None = None, inventory: Inventory | None = None) -> socketserver.BaseServer:
+    """
+    Binds a daemon to the socket, replacing a stale socket file left by a daemon which did not shut down cleanly.
+
+    :raises OSError: Another daemon is listening on the socket, or the path exists and is not a socket.
+    """
+    if sys.platform != "win32":
+        path = path or socket_path()
+        if os.path.exists(path):
+            if not stat.S_ISSOCK(os.lstat(path).st_mode):
+                raise OSError(f"{path} exists and is not a socket")
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                try:
+                    probe.connect(path)
+                except OSError:
+                    os.unlink(path)
+                else:
+                    raise OSError(f"A daemon is already listening on {path}")
+
+        old_umask = os.umask(0o077)  # only the current user can connect
+        try:
+            return Server(path, inventory or Inventory())
+        finally:
+            os.umask(old_umask)
+
+    raise OSError("Unix domain sockets are not supported on Windows")
+
+
+if sys.platform != "win32":
+
+    class _Handler(socketserver.StreamRequestHandler):
+        server: "Server"
+
+        def handle(self) -> None:
+            for line in self.rfile:
+                response: dict[str, Any]
+                try:
+                    response = {"browsers": [_pack(b) for b in self.server.answer(json.loads(line))]}
+                except (KeyError, TypeError, ValueError) as e:
+                    response = {"error": f"{type(e).__name__}: {e}"}
+                self.wfile.write(_encode(response))
+
+    class Server(socketserver.ThreadingUnixStreamServer):
+        """
+        Answers queries from an inventory which is shared by all connections.
+        """
+
+        daemon_threads = True
+
+        def __init__(self, path: str, inventory: Inventory) -> None:
+            self.inventory = inventory
+            super().__init__(path, _Handler)
+
+        def answer(self, request: dict[str, Any]) -> list[Browser]:
+            from . import get
+
+            op = request["op"]
+            if op == "browsers":
+                browser_type = request.get("browser_type")
+                return [b for b in self.inventory.browsers() if browser_type in (None, b["browser_type"])]
+            if op == "get":
+                b = get(request["browser"], request.get("version", "*"), inventory=self.inventory)
+                return [b] if b else []
+            if op == "refresh":
+                return self.inventory.refresh()
+            raise ValueError(f"Unknown operation '{op}'")
+
+        def server_close(self) -> None:
+            super().server_close()
+            with contextlib.suppress(OSError):
+                os.unlink(self.server_address)  # type: ignore[arg-type]
+
+
+def _encode(message: dict[str, Any]) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+def _pack(browser: Browser) -> list[Any]:
+    values = [browser.get(field) for field in FIELDS]
+    while values[-1] is None:  # optional fields, e.g. packaging
+        values.pop()
+    return values
+
+
+def _unpack(values: list[Any]) -> Browser:
+    return Browser(**{field: value for field, value in zip(FIELDS, values) if value is not None})  # type: ignore[typeddict-item]
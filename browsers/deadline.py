@@ -0,0 +1,53 @@
+import threading
+import time
+
+UNKNOWN_VERSION = "unknown"
+
+# versions of probes which timed out, failed or were killed
+UNRESOLVED_VERSIONS = ("", UNKNOWN_VERSION)
+
+
+class Deadline:
+    """
+    A time budget shared by all version probes (and Spotlight queries on macOS) of a scan, so the scan returns on time
+    with partial results. Browsers whose version could not be resolved in time have the version UNKNOWN_VERSION.
+
+    >>> deadline = Deadline(0)
+    >>> deadline.expired(), deadline.timeout(5)
+    (True, 0.0)
+
+    :param budget: Seconds from now until the deadline.
+    """
+
+    def __init__(self, budget: float) -> None:
+        if budget < 0:
+            raise ValueError("The budget must not be negative")
+        self.expires_at = time.monotonic() + budget
+        self.timed_out: list[str] = []  # executable paths (Linux) or bundle IDs (macOS) which were not probed in time
+        self._lock = threading.Lock()
+
+    @classmethod
+    def of(cls, deadline: "float | Deadline | None") -> "Deadline | None":
+        """
+        Returns the deadline, or a new one if a budget in seconds is given.
+        """
+        return deadline if deadline is None or isinstance(deadline, Deadline) else cls(deadline)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def timeout(self, limit: float) -> float:
+        """
+        Returns the timeout of a single step which must not run past the deadline.
+        """
+        return min(limit, self.remaining())
+
+    def time_out(self, candidate: str) -> None:
+        with self._lock:
+            self.timed_out.append(candidate)
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.3f}, timed_out={self.timed_out!r})"
@@ -0,0 +1,108 @@
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future
+
+from .common import Browser
+from .query import BrowserIndex
+
+Scan = Callable[[], Iterable[Browser]]
+
+
+class Inventory:
+    """
+    Memoizes the installed browsers so repeated lookups do not rescan the system.
+
+    The inventory is thread-safe: concurrent callers share one in-flight scan instead of starting their own.
+
+    :param ttl: Seconds after which the next lookup rescans. None keeps the result until refresh() is called.
+    :param scan: Callable returning the installed browsers, defaults to browsers.browsers.
+    """
+
+    def __init__(self, ttl: float | None = None, scan: Scan | None = None) -> None:
+        self.ttl = ttl
+        self._scan_function = scan
+        self._lock = threading.Lock()
+        self._scan: Future[list[Browser]] | None = None
+        self._scanned_at = 0.0
+        self._index: tuple[Future[list[Browser]], BrowserIndex] | None = None
+
+    def browsers(self) -> list[Browser]:
+        """
+        Returns the installed browsers, scanning the system if there is no fresh result yet.
+        """
+        return list(self._completed_scan().result())
+
+    def index(self) -> BrowserIndex:
+        """
+        Returns the installed browsers indexed by type and version. The index is built once per scan.
+        """
+        scan = self._completed_scan()
+        with self._lock:
+            if self._index is None or self._index[0] is not scan:
+                self._index = (scan, BrowserIndex(scan.result()))
+            return self._index[1]
+
+    def refresh(self) -> list[Browser]:
+        """
+        Rescans the system and returns the installed browsers.
+        """
+        self.invalidate()
+        return self.browsers()
+
+    def invalidate(self) -> None:
+        """
+        Drops the memoized result so the next lookup rescans. An in-flight scan is not affected.
+        """
+        with self._lock:
+            if self._scan is not None and self._scan.done():
+                self._scan = None
+
+    def _completed_scan(self) -> Future[list[Browser]]:
+        with self._lock:
+            scan = self._scan
+            if owner := scan is None or self._expired(scan):
+                scan = self._scan = Future()
+
+        if owner:
+            self._run(scan)
+        scan.result()  # wait for a scan started by another thread
+        return scan
+
+    def _expired(self, scan: Future[list[Browser]]) -> bool:
+        return self.ttl is not None and scan.done() and time.monotonic() - self._scanned_at >= self.ttl
+
+    def _run(self, scan: Future[list[Browser]]) -> None:
+        if self._scan_function is not None:
+            scan_function = self._scan_function
+        else:
+            from . import browsers as scan_function
+
+        try:
+            result = list(scan_function())
+        except BaseException as e:
+            with self._lock:
+                if self._scan is scan:
+                    self._scan = None
+            scan.set_exception(e)
+            raise
+
+        with self._lock:
+            self._scanned_at = time.monotonic()
+        scan.set_result(result)
+
+
+_shared_inventory: Inventory | None = None
+_shared_inventory_lock = threading.Lock()
+
+
+def shared_inventory() -> Inventory:
+    """
+    Returns the process-wide inventory. Its ttl can be changed by setting the attribute.
+    """
+    global _shared_inventory
+
+    with _shared_inventory_lock:
+        if _shared_inventory is None:
+            _shared_inventory = Inventory()
+        return _shared_inventory
@@ -1,14 +1,24 @@
-import configparser
-import glob
+import asyncio
+import contextlib
+import functools
+import itertools
 import os
 import re
 import shlex
 import shutil
+import signal
 import subprocess
 import sys
-from collections.abc import Iterator
+import threading
+from collections.abc import AsyncIterator, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import NamedTuple
 
-from .common import Browser
+from . import roots, tracing
+from .cache import DetectionCache, Fingerprint, fingerprint
+from .common import Browser, BrowserRecord, new_process_group
+from .deadline import UNKNOWN_VERSION, UNRESOLVED_VERSIONS, Deadline
+from .versions import package_type, read_static_version
 
 IGNORE_LIST = ("kfmclient",)
 
@@ -41,7 +51,7 @@ LINUX_DESKTOP_BROWSER_NAMES = {
 }
 
 XDG_DATA_LOCATIONS = (
-    # $XDG_DATA_HOME and $XDG_DATA_DIRS are not always set
+    # searched after $XDG_DATA_HOME and $XDG_DATA_DIRS since they are not always set
     "~/.local/share/applications",
     "/usr/share/applications",
     "/var/lib/snapd/desktop/applications",
@@ -50,69 +60,530 @@ XDG_DATA_LOCATIONS = (
     "/var/lib/flatpak/exports/share/applications",
 )
 
+DESKTOP_ENTRY_HEADER = b"[Desktop Entry]"
+
+# Executables which dispatch on the name they were invoked with, e.g. /snap/bin/firefox -> /usr/bin/snap
+MULTICALL_EXECUTABLES = ("snap",)
+
+PROBE_TIMEOUT = 5
+
 VERSION_PATTERN = re.compile(r"\b(\S+\.\S+)\b")  # simple pattern assuming all version strings have a dot on them
 
 
-def browsers() -> Iterator[Browser]:  # type: ignore[return]
-    if sys.platform == "linux":
-        for application_dir in XDG_DATA_LOCATIONS:
-            for desktop_file in glob.glob(os.path.join(os.path.expanduser(application_dir), "*.desktop")):
-                config = configparser.ConfigParser(interpolation=None, strict=False)
-                config.read(desktop_file, encoding="utf-8")
-                if (
-                    "WebBrowser" not in config.get("Desktop Entry", "Categories", fallback="").split(";")
-                    and config.get("Desktop Entry", "GenericName", fallback="") != "Web Browser"
-                ):
-                    continue
+class _Candidate(NamedTuple):
+    desktop_file: str
+    desktop_fingerprint: Fingerprint | None
+    browser_type: str
+    display_name: str
+    path: str
+    packaging: str | None
+
+    def browser(self, version: str) -> Browser:
+        browser = Browser(
+            browser_type=self.browser_type, path=self.path, display_name=self.display_name, version=version
+        )
+        if self.packaging is not None:
+            browser["packaging"] = self.packaging
+        return browser
 
-                display_name = config.get("Desktop Entry", "Name")
-                if flatpak_name := config.get("Desktop Entry", "X-Flatpak", fallback=""):
-                    executable_path = os.path.join(
-                        os.path.dirname(os.path.dirname(os.path.dirname(desktop_file))),
-                        "bin",
-                        flatpak_name,
+    def record(self, deadline: Deadline | None = None) -> BrowserRecord:
+        resolve = functools.partial(_resolve_version, self.browser_type, self.path, deadline)
+        return BrowserRecord(self.browser_type, self.path, self.display_name, resolve, self.packaging)
+
+
+def browsers(  # type: ignore[return]
+    browser_type: str | None = None,
+    cache: bool = False,
+    max_workers: int | None = None,
+    ordered: bool = True,
+    deadline: Deadline | None = None,
+) -> Iterator[Browser]:
+    """
+    Iterates over browsers found in desktop entries.
+
+    Desktop entries are discovered first, then the versions of all candidates are probed concurrently. Probes which
+    are still running when the iterator is closed are killed.
+
+    :param browser_type: Only probe and yield browsers of this type.
+    :param cache: Serve unchanged desktop entries from the persistent detection cache (see browsers.cache).
+    :param max_workers: Maximum number of concurrent version probes (defaults to ThreadPoolExecutor's default).
+    :param ordered: Yield browsers in desktop entry order. If False, cached browsers are yielded first and the others
+                    as soon as their version is known.
+    :param deadline: Stop waiting for version probes at the deadline. Browsers which were not probed in time have the
+                     version UNKNOWN_VERSION. Browsers whose version was not resolved are not stored in the cache.
+    """
+    if sys.platform == "linux":
+        detection_cache = DetectionCache.load() if cache else None
+        try:
+            results = list(_discover(detection_cache, browser_type))
+            candidates = [result for result in results if isinstance(result, _Candidate)]
+            probes = _Probes(deadline)
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="browsers")
+            try:
+                completed: Iterator[tuple[Browser | _Candidate, str]]
+                if ordered:
+                    versions = executor.map(
+                        probes.version, [c.browser_type for c in candidates], [c.path for c in candidates]
+                    )
+                    completed = (
+                        (result, next(versions) if isinstance(result, _Candidate) else "") for result in results
                     )
                 else:
-                    executable_path = config.get(
-                        "Desktop Entry", "TryExec", fallback=config.get("Desktop Entry", "Exec")
+                    futures = {executor.submit(probes.version, c.browser_type, c.path): c for c in candidates}
+                    completed = itertools.chain(
+                        ((result, "") for result in results if not isinstance(result, _Candidate)),
+                        ((futures[future], future.result()) for future in as_completed(futures)),
                     )
 
-                    # Try to remove BAMF_DESKTOP_FILE_HINT and find the actual executable/binary
-                    found = False
-                    for path in shlex.split(executable_path):
-                        if path == "env":
-                            continue
-
-                        if os.path.exists(path):
-                            executable_path = path
-                            found = True
-                            break
-
-                        # Find binary path from $PATH
-                        # see https://specifications.freedesktop.org/desktop-entry-spec/latest/exec-variables.html
-                        if which_path := shutil.which(path):
-                            executable_path = which_path
-                            found = True
-                            break
-
-                    if not found or executable_path.endswith(IGNORE_LIST):
-                        continue
-
-                if browser_type := LINUX_DESKTOP_BROWSER_NAMES.get(display_name):
-                    version = ""
-                    try:
-                        result = subprocess.run(
-                            [executable_path, "--version"],
-                            capture_output=True,
-                            text=True,
-                            timeout=5,
-                        )
-                        version = result.stdout.strip()
-                    except (OSError, subprocess.TimeoutExpired):
-                        pass
-                    if match := VERSION_PATTERN.search(version):
-                        version = match[0]
-
-                    yield Browser(
-                        browser_type=browser_type, path=executable_path, display_name=display_name, version=version
-                    )
+                for result, version in completed:
+                    if isinstance(result, _Candidate):
+                        browser = result.browser(version)
+                        if detection_cache is not None and version not in UNRESOLVED_VERSIONS:
+                            detection_cache.store(result.desktop_file, result.desktop_fingerprint, browser)
+                        yield browser
+                    else:
+                        yield result
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+                probes.kill()
+        finally:
+            if detection_cache is not None:
+                detection_cache.save()
+
+
+def browser_records(  # type: ignore[return]
+    browser_type: str | None = None, cache: bool = False, deadline: Deadline | None = None
+) -> Iterator[BrowserRecord]:
+    """
+    Iterates over browsers found in desktop entries without probing their versions. The version of a record is read
+    or probed when it is first accessed.
+
+    :param browser_type: Only yield browsers of this type.
+    :param cache: Serve unchanged desktop entries from the persistent detection cache (see browsers.cache). Versions
+                  resolved lazily are not stored in the cache.
+    :param deadline: Versions resolved after the deadline are UNKNOWN_VERSION.
+    """
+    if sys.platform == "linux":
+        detection_cache = DetectionCache.load() if cache else None
+        try:
+            for result in _discover(detection_cache, browser_type):
+                yield result.record(deadline) if isinstance(result, _Candidate) else BrowserRecord.from_browser(result)
+        finally:
+            if detection_cache is not None:
+                detection_cache.save()
+
+
+def root_browsers(root: str, browser_type: str | None = None) -> Iterator[Browser]:
+    """
+    Iterates over browsers found in desktop entries of a Linux root filesystem mounted at root (see browsers.roots).
+
+    Desktop entries, executables and $PATH lookups are resolved inside the root. Nothing is executed, so versions
+    which cannot be read from the installation files are empty. Paths are the ones inside the root.
+
+    :param browser_type: Only yield browsers of this type.
+    """
+    for result in _discover(None, browser_type, root):
+        if isinstance(result, _Candidate):
+            yield result.browser(_read_static_version(result.browser_type, result.path, root))
+
+
+async def async_browsers(  # type: ignore[return]
+    browser_type: str | None = None, cache: bool = False
+) -> AsyncIterator[Browser]:
+    """
+    Asynchronous version of browsers() which yields browsers as soon as their version probe completes.
+
+    :param browser_type: Only probe and yield browsers of this type.
+    :param cache: Serve unchanged desktop entries from the persistent detection cache (see browsers.cache).
+    """
+    if sys.platform == "linux":
+        detection_cache = DetectionCache.load() if cache else None
+        try:
+            results = await asyncio.to_thread(list, _discover(detection_cache, browser_type))
+            tasks = []
+            for result in results:
+                if isinstance(result, _Candidate):
+                    tasks.append(asyncio.create_task(_async_probe(result)))
+                else:
+                    yield result
+
+            try:
+                for next_completed in asyncio.as_completed(tasks):
+                    candidate, browser = await next_completed
+                    if detection_cache is not None and browser["version"] not in UNRESOLVED_VERSIONS:
+                        detection_cache.store(candidate.desktop_file, candidate.desktop_fingerprint, browser)
+                    yield browser
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            if detection_cache is not None:
+                detection_cache.save()
+
+
+async def _async_probe(candidate: _Candidate) -> tuple[_Candidate, Browser]:
+    return candidate, candidate.browser(await _async_get_version(candidate.browser_type, candidate.path))
+
+
+def _discover(
+    detection_cache: DetectionCache | None, browser_type: str | None, root: str | None = None
+) -> Iterator[Browser | _Candidate]:
+    """
+    Yields browsers served from the cache and candidates which still need a version probe, in desktop entry order.
+    Browsers and candidates which are not of browser_type (if given) are skipped.
+
+    With a root, the paths of desktop files and candidates are paths inside the root (see browsers.roots).
+    """
+    desktop_ids: set[str] = set()
+    executables: set[tuple[int, int] | str] = set()
+
+    for application_dir in _application_dirs() if root is None else roots.ROOT_APPLICATION_DIRS:
+        start = tracing.clock()
+        if root is None:
+            desktop_files = list(_desktop_files(application_dir))
+        else:
+            try:
+                host_dir = roots.resolve(root, application_dir)
+            except OSError:
+                continue
+            desktop_files = [
+                (desktop_id, application_dir + desktop_file[len(host_dir) :])
+                for desktop_id, desktop_file in _desktop_files(host_dir)
+            ]
+        if tracing.HOOKS:
+            tracing.stage("linux.list", start, application_dir)
+
+        for desktop_id, desktop_file in desktop_files:
+            # desktop entries in directories with higher priority shadow the ones with the same ID
+            if desktop_id in desktop_ids:
+                continue
+            desktop_ids.add(desktop_id)
+
+            desktop_fingerprint = None
+            if detection_cache is not None:
+                desktop_fingerprint = fingerprint(desktop_file)
+                hit, browser = detection_cache.lookup(desktop_file, desktop_fingerprint)
+                if hit:
+                    if (
+                        browser is not None
+                        and browser_type in (None, browser["browser_type"])
+                        and _is_new_executable(browser["path"], executables)
+                    ):
+                        yield browser
+                    continue
+
+            if not (entry := _parse_desktop_file(desktop_file, root)):
+                if tracing.HOOKS:
+                    tracing.count(tracing.FILES_REJECTED, desktop_file)
+                if detection_cache is not None:
+                    detection_cache.store(desktop_file, desktop_fingerprint, None)
+                continue
+
+            entry_browser_type, display_name, executable_path = entry
+            if (
+                executable_path is not None
+                and browser_type in (None, entry_browser_type)
+                and _is_new_executable(executable_path, executables, root)
+            ):
+                yield _Candidate(
+                    desktop_file,
+                    desktop_fingerprint,
+                    entry_browser_type,
+                    display_name,
+                    executable_path,
+                    package_type(executable_path, root),
+                )
+
+
+def _application_dirs() -> list[str]:
+    """
+    Returns the applications directories in order of priority, see
+    https://specifications.freedesktop.org/basedir-spec/latest/#variables
+    """
+    data_home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    data_dirs = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+
+    application_dirs = []
+    for application_dir in (
+        *(os.path.join(data_dir, "applications") for data_dir in (data_home, *data_dirs.split(os.pathsep)) if data_dir),
+        *(os.path.expanduser(location) for location in XDG_DATA_LOCATIONS),
+    ):
+        application_dir = os.path.normpath(application_dir)
+        if application_dir not in application_dirs:
+            application_dirs.append(application_dir)
+    return application_dirs
+
+
+def _desktop_files(application_dir: str, prefix: str = "") -> Iterator[tuple[str, str]]:
+    """
+    Yields the desktop file ID and path of desktop entries, including the ones in subdirectories, see
+    https://specifications.freedesktop.org/desktop-entry-spec/latest/file-naming.html#desktop-file-id
+    """
+    try:
+        with os.scandir(application_dir) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    yield from _desktop_files(entry.path, f"{prefix}{entry.name}-")
+                elif entry.name.endswith(".desktop") and entry.is_file():
+                    yield f"{prefix}{entry.name}", entry.path
+    except OSError:
+        return
+
+
+def _is_new_executable(executable_path: str, executables: set[tuple[int, int] | str], root: str | None = None) -> bool:
+    """
+    Records an executable by its resolved file so the same binary is only yielded (and probed) once per scan.
+    """
+    try:
+        real_path = os.path.realpath(executable_path) if root is None else roots.resolve(root, executable_path)
+        stat = os.stat(real_path)
+    except OSError:
+        return True
+
+    key: tuple[int, int] | str = (stat.st_dev, stat.st_ino)
+    if os.path.basename(real_path) in MULTICALL_EXECUTABLES:
+        key = executable_path
+
+    if key in executables:
+        return False
+    executables.add(key)
+    return True
+
+
+def _read_desktop_entry(desktop_file: str) -> dict[str, str] | None:
+    """
+    Returns the unlocalized keys of the [Desktop Entry] group or None if the desktop entry is not a web browser.
+
+    Only the [Desktop Entry] group is decoded, and files that do not mention a web browser are rejected before parsing.
+    """
+    try:
+        with open(desktop_file, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    if (start := data.find(DESKTOP_ENTRY_HEADER)) == -1:
+        return None
+    start += len(DESKTOP_ENTRY_HEADER)
+    end = data.find(b"\n[", start)
+    group = data[start:] if end == -1 else data[start:end]
+    if b"WebBrowser" not in group and b"Web Browser" not in group:
+        return None
+
+    entry = {}
+    for line in group.decode("utf-8", errors="replace").splitlines():
+        key, separator, value = line.partition("=")
+        key = key.strip()
+        if separator and key and not key.startswith("#") and "[" not in key:
+            entry[key] = value.strip()
+
+    if "WebBrowser" not in entry.get("Categories", "").split(";") and entry.get("GenericName") != "Web Browser":
+        return None
+    return entry
+
+
+def _parse_desktop_file(desktop_file: str, root: str | None = None) -> tuple[str, str, str | None] | None:
+    """
+    Returns the browser type, display name and executable path (None if it cannot be found) of a desktop entry
+    or None if the desktop entry is not a known browser.
+
+    :param root: Root filesystem in which the paths of the desktop file and its executable are resolved.
+    """
+    start = tracing.clock()
+    try:
+        entry = _read_desktop_entry(desktop_file if root is None else roots.resolve(root, desktop_file))
+    except OSError:
+        entry = None
+    if tracing.HOOKS:
+        tracing.stage("linux.parse", start, desktop_file)
+        tracing.count(tracing.FILES_SCANNED, desktop_file)
+    if entry is None:
+        return None
+
+    display_name = entry.get("Name", "")
+    if not (browser_type := LINUX_DESKTOP_BROWSER_NAMES.get(display_name)):
+        return None
+
+    if flatpak_name := entry.get("X-Flatpak"):
+        executable_path = os.path.join(
+            os.path.dirname(os.path.dirname(os.path.dirname(desktop_file))),
+            "bin",
+            flatpak_name,
+        )
+        return browser_type, display_name, executable_path
+
+    exec_line = entry.get("TryExec") or entry.get("Exec", "")
+
+    # Try to remove BAMF_DESKTOP_FILE_HINT and find the actual executable/binary
+    for path in shlex.split(exec_line):
+        if path == "env":
+            continue
+
+        if os.path.exists(path) if root is None else roots.exists(root, path):
+            executable_path = path
+            break
+
+        # Find binary path from $PATH
+        # see https://specifications.freedesktop.org/desktop-entry-spec/latest/exec-variables.html
+        start = tracing.clock()
+        which_path = shutil.which(path) if root is None else roots.which(root, path)
+        if tracing.HOOKS:
+            tracing.stage("linux.which", start, path)
+        if which_path:
+            executable_path = which_path
+            break
+    else:
+        return browser_type, display_name, None
+
+    if executable_path.endswith(IGNORE_LIST):
+        return None
+
+    return browser_type, display_name, executable_path
+
+
+async def _async_get_version(browser_type: str, executable_path: str) -> str:
+    if version := await asyncio.to_thread(_read_static_version, browser_type, executable_path):
+        return version
+    return await _async_probe_version(executable_path)
+
+
+def _read_static_version(browser_type: str, executable_path: str, root: str | None = None) -> str:
+    start = tracing.clock()
+    version = read_static_version(browser_type, executable_path, root)
+    if tracing.HOOKS:
+        tracing.stage("linux.static_version", start, executable_path)
+    return version
+
+
+def _resolve_version(browser_type: str, executable_path: str, deadline: Deadline | None) -> str:
+    return _Probes(deadline).version(browser_type, executable_path)
+
+
+class _Probes:
+    """
+    The version probes of one scan. kill() kills the running probes and skips the ones which did not start yet.
+    Probes which do not complete before the deadline are killed and return UNKNOWN_VERSION.
+
+    Probes run in their own process group, which is killed as a whole so children of launcher scripts which keep
+    stdout open do not outlive the timeout.
+    """
+
+    def __init__(self, deadline: Deadline | None = None) -> None:
+        self._deadline = deadline
+        self._lock = threading.Lock()
+        self._processes: set[subprocess.Popen] = set()
+        self._killed = False
+
+    def version(self, browser_type: str, executable_path: str) -> str:
+        """
+        Reads the version from the installation files and falls back to running the browser with --version.
+        """
+        return _read_static_version(browser_type, executable_path) or self.probe(executable_path)
+
+    def probe(self, executable_path: str) -> str:
+        if self._killed:
+            return ""
+        if self._deadline is not None and self._deadline.expired():
+            self._deadline.time_out(executable_path)
+            return UNKNOWN_VERSION
+
+        start = tracing.clock()
+        if tracing.HOOKS:
+            tracing.count(tracing.PROBES_SPAWNED, executable_path)
+        try:
+            process = subprocess.Popen(
+                [executable_path, "--version"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                **new_process_group(),
+            )
+        except OSError:
+            return ""
+
+        with self._lock:
+            self._processes.add(process)
+            if self._killed:  # killed while starting
+                _kill_process_group(process)
+
+        timeout = PROBE_TIMEOUT if self._deadline is None else self._deadline.timeout(PROBE_TIMEOUT)
+        try:
+            stdout, _ = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            if tracing.HOOKS:
+                tracing.count(tracing.PROBE_TIMEOUTS, executable_path)
+            _kill_process_group(process)
+            process.wait()  # like subprocess.run(), without waiting for EOF on stdout
+            if process.stdout is not None:
+                process.stdout.close()
+            if self._deadline is not None and timeout < PROBE_TIMEOUT:
+                self._deadline.time_out(executable_path)
+                return UNKNOWN_VERSION
+            return ""
+        finally:
+            with self._lock:
+                self._processes.discard(process)
+            if tracing.HOOKS:
+                tracing.stage("linux.probe", start, executable_path)
+        return _parse_version(stdout)
+
+    def kill(self) -> None:
+        with self._lock:
+            self._killed = True
+            for process in self._processes:
+                _kill_process_group(process)
+
+
+def _kill_process_group(process: subprocess.Popen | asyncio.subprocess.Process) -> None:
+    if sys.platform == "win32":
+        process.kill()
+    else:
+        with contextlib.suppress(ProcessLookupError):
+            os.killpg(process.pid, signal.SIGKILL)
+
+
+async def _async_probe_version(executable_path: str) -> str:
+    start = tracing.clock()
+    if tracing.HOOKS:
+        tracing.count(tracing.PROBES_SPAWNED, executable_path)
+    try:
+        process = await asyncio.create_subprocess_exec(
+            executable_path,
+            "--version",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            **new_process_group(),
+        )
+    except OSError:
+        return ""
+
+    try:
+        stdout, _ = await asyncio.wait_for(process.communicate(), timeout=PROBE_TIMEOUT)
+    except asyncio.TimeoutError:
+        if tracing.HOOKS:
+            tracing.count(tracing.PROBE_TIMEOUTS, executable_path)
+        return ""
+    finally:
+        if process.returncode is None:  # timed out or cancelled
+            _kill_process_group(process)
+            # Process.wait() also waits for EOF on stdout, which children outside the process group may keep open
+            if (stdout_transport := process._transport.get_pipe_transport(1)) is not None:  # type: ignore[attr-defined]
+                stdout_transport.close()
+            await process.wait()
+        if tracing.HOOKS:
+            tracing.stage("linux.probe", start, executable_path)
+    return _parse_version(stdout.decode(errors="replace"))
+
+
+def _parse_version(output: str) -> str:
+    """
+    >>> _parse_version("Mozilla Firefox 124.0.2\\n")
+    '124.0.2'
+    >>> _parse_version("")
+    ''
+    """
+    version = output.strip()
+    if match := VERSION_PATTERN.search(version):
+        version = match[0]
+    return version
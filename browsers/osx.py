@@ -1,11 +1,16 @@
+import asyncio
 import glob
 import os
 import plistlib
+import re
 import subprocess
 import sys
-from collections.abc import Iterator
+from collections.abc import AsyncIterator, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
 
+from . import tracing
 from .common import Browser
+from .deadline import Deadline
 
 OSX_BROWSER_BUNDLE_LIST = (
     # browser name, bundle ID, version string
@@ -49,46 +54,222 @@ OSX_BROWSER_BUNDLE_LIST = (
 
 OSX_BROWSER_BUNDLE_DICT = {item[1]: item for item in OSX_BROWSER_BUNDLE_LIST}
 
+# directories scanned for application bundles which Spotlight did not find (e.g. because indexing is disabled)
+OSX_APPLICATION_ROOTS = ("/Applications",)
 
-def browsers() -> Iterator[Browser]:  # type: ignore[return]
+# Info.plist keys used by _get_browser_info, other keys are dropped after parsing
+OSX_PLIST_KEYS = (
+    "CFBundleIdentifier",
+    "CFBundleExecutable",
+    "CFBundleDisplayName",
+    "CFBundleName",
+    "CFBundleShortVersionString",
+    "CFBundleVersion",
+)
+
+# bundle IDs are stored as plain ASCII in both XML and binary property lists, so other bundles are rejected unparsed
+BUNDLE_ID_PATTERN = re.compile(b"|".join(re.escape(bundle_id.encode()) for bundle_id in OSX_BROWSER_BUNDLE_DICT))
+
+
+def browsers(
+    browser_type: str | None = None, deadline: Deadline | None = None, roots: Sequence[str] | None = None
+) -> Iterator[Browser]:
+    """
+    Iterates over application bundles of known browsers found by one Spotlight query, then over the ones in roots.
+
+    Only mdfind and the bundle files are used, so a fixture tree and a stub mdfind on $PATH also work on other
+    platforms.
+
+    :param browser_type: Only query the bundle IDs of and yield browsers of this type.
+    :param deadline: Skip the Spotlight query if it does not complete before the deadline. The browsers are still
+                     found if they are installed in one of the roots.
+    :param roots: Directories scanned for application bundles, defaults to OSX_APPLICATION_ROOTS.
+    """
+    found_browser_plists: set[str] = set()
+
+    bundles = _bundles(browser_type)
+    app_dirs = _mdfind([bundle_id for _, bundle_id, _ in bundles], deadline) or []
+    yield from _browsers_from_app_dirs(app_dirs, browser_type, found_browser_plists)
+
+    yield from _browsers_from_applications(found_browser_plists, browser_type, roots)
+
+
+async def async_browsers(browser_type: str | None = None) -> AsyncIterator[Browser]:  # type: ignore[return]
+    """
+    Asynchronous version of browsers() which runs the Spotlight query and parses the bundles in a thread.
+
+    :param browser_type: Only query the bundle IDs of and yield browsers of this type.
+    """
     if sys.platform == "darwin":
-        found_browser_plists = set()
-
-        for browser, bundle_id, version_string in OSX_BROWSER_BUNDLE_LIST:
-            app_dirs = subprocess.getoutput(f'mdfind "kMDItemCFBundleIdentifier == {bundle_id}"').splitlines()
-            for app_dir in app_dirs:
-                plist_path = os.path.join(app_dir, "Contents/Info.plist")
-                if plist_path in found_browser_plists:
-                    continue
-
-                found_browser_plists.add(plist_path)
-
-                try:
-                    with open(plist_path, "rb") as f:
-                        plist = plistlib.load(f)
-                        yield _get_browser_info(app_dir, browser, plist, version_string)
-                except (OSError, plistlib.InvalidFileException):
-                    continue
-
-        # Naively iterate /Applications folder in case the above check fails
-        for plist_path in glob.glob("/Applications/*.app/Contents/Info.plist"):
-            if plist_path in found_browser_plists:
-                continue
-
-            try:
-                with open(plist_path, "rb") as f:
-                    plist = plistlib.load(f)
-                    bundle_id = plist.get("CFBundleIdentifier")
-                    if bundle_id not in OSX_BROWSER_BUNDLE_DICT:
-                        continue
-
-                    found_browser_plists.add(plist_path)
-                    browser, _, version_string = OSX_BROWSER_BUNDLE_DICT[bundle_id]
-                    app_dir = os.path.dirname(os.path.dirname(plist_path))
-
-                    yield _get_browser_info(app_dir, browser, plist, version_string)
-            except (OSError, plistlib.InvalidFileException):
-                continue
+        found_browser_plists: set[str] = set()
+
+        bundle_ids = [bundle_id for _, bundle_id, _ in _bundles(browser_type)]
+        app_dirs = await _async_mdfind(bundle_ids)
+        for b in await asyncio.to_thread(list, _browsers_from_app_dirs(app_dirs, browser_type, found_browser_plists)):
+            yield b
+
+        for b in await asyncio.to_thread(list, _browsers_from_applications(found_browser_plists, browser_type)):
+            yield b
+
+
+def _mdfind(bundle_ids: Sequence[str], deadline: Deadline | None = None) -> list[str] | None:
+    """
+    Returns the application bundles with any of the bundle IDs found by Spotlight, or None if the deadline passed.
+    """
+    if not bundle_ids:
+        return []
+    if deadline is not None and deadline.expired():
+        for bundle_id in bundle_ids:
+            deadline.time_out(bundle_id)
+        return None
+
+    start = tracing.clock()
+    try:
+        stdout = subprocess.run(
+            ["mdfind", _query(bundle_ids)],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            timeout=None if deadline is None else deadline.remaining(),
+        ).stdout
+    except subprocess.TimeoutExpired:
+        if deadline is not None:
+            for bundle_id in bundle_ids:
+                deadline.time_out(bundle_id)
+        return None
+    except OSError:
+        return []
+    finally:
+        if tracing.HOOKS:
+            tracing.stage("osx.mdfind", start, ",".join(bundle_ids))
+    return stdout.splitlines()
+
+
+async def _async_mdfind(bundle_ids: Sequence[str]) -> list[str]:
+    if not bundle_ids:
+        return []
+
+    start = tracing.clock()
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "mdfind",
+            _query(bundle_ids),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+    except OSError:
+        return []
+    try:
+        stdout, _ = await process.communicate()
+    finally:
+        if process.returncode is None:  # cancelled
+            process.kill()
+            await process.wait()
+        if tracing.HOOKS:
+            tracing.stage("osx.mdfind", start, ",".join(bundle_ids))
+    return stdout.decode(errors="replace").splitlines()
+
+
+def _query(bundle_ids: Sequence[str]) -> str:
+    """
+    >>> _query(["com.google.Chrome", "org.mozilla.firefox"])
+    'kMDItemCFBundleIdentifier == "com.google.Chrome" || kMDItemCFBundleIdentifier == "org.mozilla.firefox"'
+    """
+    return " || ".join(f'kMDItemCFBundleIdentifier == "{bundle_id}"' for bundle_id in bundle_ids)
+
+
+def _browsers_from_app_dirs(
+    app_dirs: list[str], browser_type: str | None, found_browser_plists: set[str]
+) -> Iterator[Browser]:
+    """
+    Yields the browsers of the application bundles in the order of OSX_BROWSER_BUNDLE_LIST.
+    """
+    plist_paths = []
+    for app_dir in app_dirs:
+        plist_path = os.path.join(app_dir, "Contents/Info.plist")
+        if plist_path not in found_browser_plists:
+            found_browser_plists.add(plist_path)
+            plist_paths.append(plist_path)
+
+    found = []
+    for plist_path, plist in zip(plist_paths, _load_plists(plist_paths)):
+        if plist is not None and (item := OSX_BROWSER_BUNDLE_DICT.get(plist.get("CFBundleIdentifier", ""))):
+            browser, _, version_string = item
+            if browser_type in (None, browser):
+                found.append((OSX_BROWSER_BUNDLE_LIST.index(item), plist_path, browser, plist, version_string))
+
+    for _, plist_path, browser, plist, version_string in sorted(found, key=lambda f: f[0]):
+        yield _get_browser_info(os.path.dirname(os.path.dirname(plist_path)), browser, plist, version_string)
+
+
+def _bundles(browser_type: str | None) -> list[tuple[str, str, str]]:
+    """
+    >>> _bundles("safari")
+    [('safari', 'com.apple.Safari', 'CFBundleShortVersionString')]
+    """
+    return [item for item in OSX_BROWSER_BUNDLE_LIST if browser_type in (None, item[0])]
+
+
+def _browsers_from_applications(
+    found_browser_plists: set[str], browser_type: str | None = None, roots: Sequence[str] | None = None
+) -> Iterator[Browser]:
+    """
+    Naively iterate the application roots in case the Spotlight query fails
+    """
+    plist_paths = []
+    for root in OSX_APPLICATION_ROOTS if roots is None else roots:
+        start = tracing.clock()
+        plist_paths += [
+            plist_path
+            for path in sorted(glob.glob("*.app/Contents/Info.plist", root_dir=root))
+            if (plist_path := os.path.join(root, path)) not in found_browser_plists
+        ]
+        if tracing.HOOKS:
+            tracing.stage("osx.glob", start, root)
+
+    for plist_path, plist in zip(plist_paths, _load_plists(plist_paths)):
+        if plist is None or (item := OSX_BROWSER_BUNDLE_DICT.get(plist.get("CFBundleIdentifier", ""))) is None:
+            continue
+
+        found_browser_plists.add(plist_path)
+        browser, _, version_string = item
+        if browser_type not in (None, browser):
+            continue
+        app_dir = os.path.dirname(os.path.dirname(plist_path))
+
+        yield _get_browser_info(app_dir, browser, plist, version_string)
+
+
+def _load_plists(plist_paths: list[str]) -> Iterator[dict | None]:
+    """
+    Loads the property lists in parallel, in order.
+    """
+    if len(plist_paths) < 2:
+        return map(_load_plist, plist_paths)
+    with ThreadPoolExecutor(thread_name_prefix="browsers") as executor:
+        return iter(list(executor.map(_load_plist, plist_paths)))
+
+
+def _load_plist(plist_path: str) -> dict | None:
+    """
+    Returns the OSX_PLIST_KEYS of a property list, or None if it is not the property list of a known browser.
+    """
+    start = tracing.clock()
+    try:
+        with open(plist_path, "rb") as f:
+            data = f.read()
+        if not BUNDLE_ID_PATTERN.search(data):
+            if tracing.HOOKS:
+                tracing.count(tracing.FILES_REJECTED, plist_path)
+            return None
+        plist = plistlib.loads(data)
+    except (OSError, plistlib.InvalidFileException):
+        return None
+    finally:
+        if tracing.HOOKS:
+            tracing.stage("osx.plist", start, plist_path)
+            tracing.count(tracing.FILES_SCANNED, plist_path)
+    return {key: plist[key] for key in OSX_PLIST_KEYS if key in plist}
 
 
 def _get_browser_info(app_dir: str, browser: str, plist: dict, version_string: str) -> Browser:
@@ -0,0 +1,116 @@
+"""
+Reads the file version of Windows executables (PE files) from their VS_FIXEDFILEINFO resource without the Windows API,
+so versions can also be read on other platforms, e.g. from a mounted Windows image.
+
+The file is memory-mapped and only the headers, the resource directory and the version resource are read.
+"""
+
+import functools
+import mmap
+import os
+import struct
+
+RT_VERSION = 16
+IMAGE_DIRECTORY_ENTRY_RESOURCE = 2
+VS_FIXEDFILEINFO_SIGNATURE = struct.pack("<I", 0xFEEF04BD)
+
+PE32_MAGIC = 0x10B
+PE32_PLUS_MAGIC = 0x20B
+
+# offsets of NumberOfRvaAndSizes (followed by the data directories) in the optional header
+NUMBER_OF_RVA_AND_SIZES_OFFSETS = {PE32_MAGIC: 92, PE32_PLUS_MAGIC: 108}
+
+SUBDIRECTORY_FLAG = 0x80000000
+
+
+def file_version(path: str) -> str:
+    """
+    Returns the file version (e.g. "120.0.6099.109") of a PE file, or an empty string if it has none.
+
+    Results are memoized per path, size and modification time.
+    """
+    try:
+        stat = os.stat(path)
+        return _file_version(path, stat.st_size, stat.st_mtime_ns)
+    except (OSError, ValueError, struct.error):
+        return ""
+
+
+@functools.lru_cache(maxsize=256)
+def _file_version(path: str, size: int, mtime_ns: int) -> str:
+    if not size:
+        return ""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return read_file_version(data)
+
+
+def read_file_version(data: bytes | mmap.mmap) -> str:
+    """
+    Returns the file version of the PE image in data, or an empty string if it has no version resource.
+
+    :raises ValueError: data is not a PE image.
+    :raises struct.error: The image is truncated.
+    """
+    if data[:2] != b"MZ":
+        raise ValueError("Missing DOS header")
+    (pe_offset,) = struct.unpack_from("<I", data, 0x3C)
+    if data[pe_offset : pe_offset + 4] != b"PE\0\0":
+        raise ValueError("Missing PE signature")
+
+    number_of_sections, size_of_optional_header = struct.unpack_from("<H12xH", data, pe_offset + 6)
+    optional_header = pe_offset + 24
+    (magic,) = struct.unpack_from("<H", data, optional_header)
+    if magic not in NUMBER_OF_RVA_AND_SIZES_OFFSETS:
+        raise ValueError(f"Unknown optional header magic {magic:#x}")
+
+    number_of_rva_and_sizes_offset = optional_header + NUMBER_OF_RVA_AND_SIZES_OFFSETS[magic]
+    (number_of_rva_and_sizes,) = struct.unpack_from("<I", data, number_of_rva_and_sizes_offset)
+    if number_of_rva_and_sizes <= IMAGE_DIRECTORY_ENTRY_RESOURCE:
+        return ""
+    resource_rva, _ = struct.unpack_from("<II", data, number_of_rva_and_sizes_offset + 4 + 8 * 2)
+    if not resource_rva:
+        return ""
+
+    sections = [
+        struct.unpack_from("<8xIIII", data, optional_header + size_of_optional_header + 40 * i)
+        for i in range(number_of_sections)
+    ]
+
+    def offset(rva: int) -> int:
+        for virtual_size, virtual_address, size_of_raw_data, pointer_to_raw_data in sections:
+            if virtual_address <= rva < virtual_address + max(virtual_size, size_of_raw_data):
+                return rva - virtual_address + pointer_to_raw_data
+        raise ValueError(f"RVA {rva:#x} is not in a section")
+
+    resources = offset(resource_rva)
+    # the resource tree has three levels: type, name and language
+    entry = _resource_entry(data, resources, RT_VERSION)
+    for _ in range(2):
+        if entry is None or not entry & SUBDIRECTORY_FLAG:
+            return ""
+        entry = _resource_entry(data, resources + (entry & ~SUBDIRECTORY_FLAG), None)
+    if entry is None or entry & SUBDIRECTORY_FLAG:
+        return ""
+
+    version_rva, version_size = struct.unpack_from("<II", data, resources + entry)
+    version_info = offset(version_rva)
+    # VS_VERSIONINFO starts with its length and the "VS_VERSION_INFO" key, followed by VS_FIXEDFILEINFO
+    fixed_file_info = data.find(VS_FIXEDFILEINFO_SIGNATURE, version_info, version_info + min(version_size, 128))
+    if fixed_file_info < 0:
+        return ""
+
+    file_version_ms, file_version_ls = struct.unpack_from("<II", data, fixed_file_info + 8)
+    return f"{file_version_ms >> 16}.{file_version_ms & 0xFFFF}.{file_version_ls >> 16}.{file_version_ls & 0xFFFF}"
+
+
+def _resource_entry(data: bytes | mmap.mmap, directory: int, resource_id: int | None) -> int | None:
+    """
+    Returns OffsetToData of the directory entry with the resource ID, or of the first entry if resource_id is None.
+    """
+    number_of_named_entries, number_of_id_entries = struct.unpack_from("<HH", data, directory + 12)
+    entries = directory + 16
+    for i in range(number_of_named_entries + number_of_id_entries):
+        name, offset_to_data = struct.unpack_from("<II", data, entries + 8 * i)
+        if resource_id is None or (i >= number_of_named_entries and name == resource_id):
+            return offset_to_data
+    return None
@@ -0,0 +1,197 @@
+import contextlib
+import subprocess
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+from types import TracebackType
+
+from .common import new_process_group, terminate_process_group
+from .inventory import Inventory
+from .resources import ResourceLimits
+
+
+@dataclass
+class PooledBrowser:
+    process: subprocess.Popen
+    created_at: float
+    uses: int = 0
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.created_at
+
+
+@dataclass
+class PoolMetrics:
+    """
+    Counters and timings (in seconds) of a BrowserPool, useful for sizing it.
+    """
+
+    spawned: int = 0
+    recycled: int = 0
+    spawn_times: list[float] = field(default_factory=list)
+    acquire_waits: list[float] = field(default_factory=list)
+
+
+class BrowserPool:
+    """
+    Keeps warm browser processes which are handed out with acquire() and taken back with release().
+
+    Instances are recycled after max_uses acquisitions or max_age seconds, or when they exit. Each instance runs in its
+    own process group so close() also terminates the processes it spawned (e.g. renderers).
+
+    :param browser: Browser key.
+    :param version: Version specification (supports wildcard, e.g. 100.*, and ranges, e.g. >=120,<130)
+    :param size: Number of browser processes.
+    :param args: Arguments to be passed to the browser.
+    :param url: URL opened by every instance.
+    :param max_uses: Recycle an instance after it was acquired this many times.
+    :param max_age: Recycle an instance when it is released after this many seconds.
+    :param inventory: Look up the browser in a memoized inventory (e.g. shared_inventory()) instead of scanning.
+    :param limits: Resource controls applied to every instance, e.g. a CPU set per pool.
+    """
+
+    def __init__(
+        self,
+        browser: str,
+        version: str = "*",
+        size: int = 1,
+        args: Sequence[str] | None = None,
+        url: str | None = None,
+        max_uses: int | None = None,
+        max_age: float | None = None,
+        inventory: Inventory | None = None,
+        limits: ResourceLimits | None = None,
+    ) -> None:
+        from . import get
+
+        if not (b := get(browser, version, inventory=inventory)):
+            raise ValueError(f"Cannot find browser '{browser}'")
+
+        self.browser = browser
+        self.path = b["path"]
+        self.size = size
+        self.args = list(args or [])
+        self.url = url
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self.limits = limits
+        self.metrics = PoolMetrics()
+
+        self._condition = threading.Condition()
+        self._idle: deque[PooledBrowser] = deque()
+        self._instances: dict[int, PooledBrowser] = {}
+        self._closed = False
+
+        for _ in range(size):
+            self._idle.append(self._spawn())
+
+    def acquire(self, timeout: float | None = None) -> PooledBrowser:
+        """
+        Returns an idle browser, waiting up to timeout seconds (forever if None) for one to be released.
+
+        :raises TimeoutError: No browser was released in time.
+        """
+        start = time.monotonic()
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._idle or self._closed, timeout):
+                raise TimeoutError(f"No idle '{self.browser}' within {timeout} seconds")
+            if self._closed:
+                raise RuntimeError("BrowserPool is closed")
+
+            instance = self._idle.popleft()
+            self.metrics.acquire_waits.append(time.monotonic() - start)
+
+        if instance.process.poll() is not None:
+            instance = self._replace(instance)
+
+        instance.uses += 1
+        return instance
+
+    def release(self, instance: PooledBrowser) -> None:
+        """
+        Returns a browser to the pool, recycling it if it is used up, too old or exited. Browsers released after the
+        pool was closed are terminated.
+        """
+        with self._condition:
+            closed = self._closed
+        if closed:
+            terminate_process_group(instance.process)
+            return
+
+        if self._is_retired(instance):
+            try:
+                instance = self._replace(instance)
+            except RuntimeError:
+                if self._closed:  # closed while spawning the replacement, which was terminated
+                    return
+                raise
+
+        with self._condition:
+            if self._closed:
+                terminate_process_group(instance.process)
+                return
+            self._idle.append(instance)
+            self._condition.notify()
+
+    @contextlib.contextmanager
+    def lease(self, timeout: float | None = None) -> Iterator[PooledBrowser]:
+        instance = self.acquire(timeout)
+        try:
+            yield instance
+        finally:
+            self.release(instance)
+
+    def close(self) -> None:
+        """
+        Terminates all browsers (including the ones in use) and their process groups.
+        """
+        with self._condition:
+            self._closed = True
+            instances = list(self._instances.values())
+            self._instances.clear()
+            self._idle.clear()
+            self._condition.notify_all()
+
+        for instance in instances:
+            terminate_process_group(instance.process)
+
+    def __enter__(self) -> "BrowserPool":
+        return self
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc_val: BaseException | None, exc_tb: TracebackType | None
+    ) -> None:
+        self.close()
+
+    def _is_retired(self, instance: PooledBrowser) -> bool:
+        return (
+            instance.process.poll() is not None
+            or (self.max_uses is not None and instance.uses >= self.max_uses)
+            or (self.max_age is not None and instance.age >= self.max_age)
+        )
+
+    def _replace(self, instance: PooledBrowser) -> PooledBrowser:
+        with self._condition:
+            self._instances.pop(id(instance), None)
+            self.metrics.recycled += 1
+        terminate_process_group(instance.process)
+        return self._spawn()
+
+    def _spawn(self) -> PooledBrowser:
+        from . import _launch
+
+        start = time.monotonic()
+        process = _launch(self.browser, self.path, self.args, self.url, limits=self.limits, **new_process_group())
+        instance = PooledBrowser(process=process, created_at=time.monotonic())
+
+        with self._condition:
+            if self._closed:
+                terminate_process_group(process)
+                raise RuntimeError("BrowserPool is closed")
+            self._instances[id(instance)] = instance
+            self.metrics.spawned += 1
+            self.metrics.spawn_times.append(instance.created_at - start)
+        return instance
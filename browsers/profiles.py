@@ -0,0 +1,115 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from .common import browser_family
+
+# tmpfs avoids disk I/O while the browser initializes and uses its profile
+PROFILE_ROOT = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+PROFILE_PREFIX = "pybrowsers-profile-"
+
+# lock files of a running browser which must not be cloned from a template
+PROFILE_LOCK_FILES = ("SingletonCookie", "SingletonLock", "SingletonSocket", "lock", ".parentlock", "parent.lock")
+
+PROFILE_FLAGS = ("--user-data-dir", "-profile", "--profile")
+
+FICLONE = 0x40049409  # ioctl cloning a file on copy-on-write filesystems (e.g. Btrfs, XFS)
+
+
+@dataclass(frozen=True)
+class EphemeralProfile:
+    path: str
+    creation_time: float
+
+    def remove(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def create_profile(template: str | None = None, root: str | None = None, hardlinks: bool = False) -> EphemeralProfile:
+    """
+    Creates an empty profile directory or clones a template profile (e.g. one which completed first-run setup).
+
+    Files are cloned with copy-on-write where the filesystem supports it and copied otherwise.
+
+    :param template: Profile directory to clone.
+    :param root: Directory in which the profile is created, defaults to PROFILE_ROOT.
+    :param hardlinks: Hard link files instead of copying them. Only safe for templates whose files the browser replaces
+                      instead of modifying them in place, since changes would also modify the template.
+    """
+    start = time.monotonic()
+    path = tempfile.mkdtemp(prefix=PROFILE_PREFIX, dir=root or PROFILE_ROOT)
+    if template is not None:
+        try:
+            shutil.copytree(
+                template,
+                path,
+                symlinks=True,
+                ignore=shutil.ignore_patterns(*PROFILE_LOCK_FILES),
+                copy_function=_link_file if hardlinks else _clone_file,
+                dirs_exist_ok=True,
+            )
+        except BaseException:
+            shutil.rmtree(path, ignore_errors=True)
+            raise
+    return EphemeralProfile(path=path, creation_time=time.monotonic() - start)
+
+
+def profile_args(browser: str, args: Sequence[str], path: str) -> list[str]:
+    """
+    Returns the arguments which make a browser use the profile directory.
+
+    >>> profile_args("chrome", [], "/dev/shm/profile"), profile_args("firefox", [], "/dev/shm/profile")
+    (['--user-data-dir=/dev/shm/profile'], ['-profile', '/dev/shm/profile'])
+    """
+    if any(arg.split("=")[0] in PROFILE_FLAGS for arg in args):
+        raise ValueError("The arguments already select a profile")
+
+    family = browser_family(browser)
+    if family == "chromium":
+        return [f"--user-data-dir={path}"]
+    if family == "gecko":
+        return ["-profile", path]
+    raise ValueError(f"Cannot select the profile of '{browser}'")
+
+
+def remove_when_exited(process: subprocess.Popen, profile: EphemeralProfile) -> threading.Thread:
+    """
+    Removes the profile once the process exited. Profiles of browsers which outlive the Python process are left in
+    their root with the PROFILE_PREFIX.
+    """
+
+    def wait_and_remove() -> None:
+        process.wait()
+        profile.remove()
+
+    thread = threading.Thread(target=wait_and_remove, name=f"browsers-profile-{process.pid}", daemon=True)
+    thread.start()
+    return thread
+
+
+def _link_file(source: str, destination: str) -> str:
+    try:
+        os.link(source, destination)
+    except OSError:  # e.g. across filesystems
+        return _clone_file(source, destination)
+    return destination
+
+
+def _clone_file(source: str, destination: str) -> str:
+    if sys.platform == "linux":
+        import fcntl
+
+        try:
+            with open(source, "rb") as src, open(destination, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            shutil.copystat(source, destination)
+            return destination
+        except OSError:
+            pass
+    return shutil.copy2(source, destination)
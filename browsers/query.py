@@ -0,0 +1,133 @@
+import fnmatch
+import functools
+import re
+from collections.abc import Callable, Iterable
+from typing import Literal
+
+from .common import Browser, BrowserRecord
+
+Order = Literal["newest", "oldest"]
+Version = tuple[int, ...]
+VersionMatcher = Callable[[str, Version], bool]
+
+NUMBER_PATTERN = re.compile(r"\d+")
+CLAUSE_PATTERN = re.compile(r"^(~=|==|!=|>=|<=|>|<)\s*(\S+)$")
+
+
+def parse_version(version: str) -> Version:
+    """
+    Parses a version string into a tuple of integers which can be compared.
+
+    >>> parse_version("120.0.6099.109")
+    (120, 0, 6099, 109)
+    >>> parse_version("1.61.109 beta")
+    (1, 61, 109)
+    >>> parse_version("")
+    ()
+    """
+    return tuple(int(number) for number in NUMBER_PATTERN.findall(version))
+
+
+@functools.lru_cache(maxsize=128)
+def version_matcher(spec: str) -> VersionMatcher:
+    """
+    Compiles a version specification into a matcher receiving the version string and its parsed version.
+
+    A specification is a comma-separated list of clauses which must all match. A clause is either a comparison
+    (>=, <=, >, <, ==, !=, ~=) or a wildcard pattern (e.g. 100.*).
+
+    >>> matcher = version_matcher(">=120,<130")
+    >>> matcher("120.0.6099.109", (120, 0, 6099, 109)), matcher("130.0", (130, 0))
+    (True, False)
+    >>> version_matcher("~=121.0")("121.5", (121, 5)), version_matcher("~=121.0")("122.0", (122, 0))
+    (True, False)
+    >>> version_matcher("100.*")("100.0.4896.127", (100, 0, 4896, 127))
+    True
+    """
+    clauses = [_clause_matcher(clause.strip()) for clause in spec.split(",") if clause.strip()]
+    return lambda version, parsed: all(clause(version, parsed) for clause in clauses)
+
+
+def matches(browser: Browser | BrowserRecord, spec: str) -> bool:
+    """
+    Returns True if the version of a browser satisfies a version specification (see version_matcher).
+    """
+    version = browser["version"]
+    return version_matcher(spec)(version, parse_version(version))
+
+
+def _clause_matcher(clause: str) -> VersionMatcher:
+    if not (match := CLAUSE_PATTERN.match(clause)):
+        return lambda version, _: fnmatch.fnmatch(version, clause)
+
+    operator, operand = match.groups()
+    expected = parse_version(operand)
+    if not expected:
+        raise ValueError(f"Invalid version in '{clause}'")
+
+    if operator == "~=":
+        if len(expected) < 2:
+            raise ValueError(f"'{clause}' requires at least two version components")
+        prefix = expected[:-1]
+        return lambda _, parsed: bool(parsed) and _compare(parsed, expected) >= 0 and parsed[: len(prefix)] == prefix
+
+    comparisons: dict[str, Callable[[int], bool]] = {
+        "==": lambda result: result == 0,
+        "!=": lambda result: result != 0,
+        ">=": lambda result: result >= 0,
+        "<=": lambda result: result <= 0,
+        ">": lambda result: result > 0,
+        "<": lambda result: result < 0,
+    }
+    comparison = comparisons[operator]
+    return lambda _, parsed: bool(parsed) and comparison(_compare(parsed, expected))
+
+
+def _compare(version: Version, other: Version) -> int:
+    """
+    Compares two versions, padding the shorter one with zeros.
+
+    >>> _compare((120, 0), (120,)), _compare((119, 9), (120,)), _compare((121,), (120, 5))
+    (0, -1, 1)
+    """
+    length = max(len(version), len(other))
+    padded_version = version + (0,) * (length - len(version))
+    padded_other = other + (0,) * (length - len(other))
+    return (padded_version > padded_other) - (padded_version < padded_other)
+
+
+class BrowserIndex:
+    """
+    Browsers grouped by browser type and sorted by version, with each version parsed once.
+    """
+
+    def __init__(self, browsers: Iterable[Browser]) -> None:
+        self._browsers: dict[str, list[tuple[Version, Browser]]] = {}
+        for browser in browsers:
+            self._browsers.setdefault(browser["browser_type"], []).append((parse_version(browser["version"]), browser))
+        for entries in self._browsers.values():
+            entries.sort(key=lambda entry: entry[0])
+
+    def browser_types(self) -> list[str]:
+        return sorted(self._browsers)
+
+    def find(self, browser_type: str, version: str = "*", order: Order = "newest") -> list[Browser]:
+        """
+        Returns the browsers of a type whose version matches the specification, sorted by version.
+
+        :param browser_type: Browser key.
+        :param version: Version specification, e.g. "100.*", ">=120,<130" or "~=121.0".
+        :param order: "newest" or "oldest" first.
+        """
+        matcher = version_matcher(version)
+        entries = self._browsers.get(browser_type, [])
+        if order == "newest":
+            entries = entries[::-1]
+        return [browser for parsed, browser in entries if matcher(browser["version"], parsed)]
+
+    def select(self, browser_type: str, version: str = "*", order: Order = "newest") -> Browser | None:
+        """
+        Returns the newest (or oldest) browser of a type whose version matches the specification.
+        """
+        found = self.find(browser_type, version, order)
+        return found[0] if found else None
@@ -0,0 +1,137 @@
+import socket
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from .common import browser_family
+
+POLL_INTERVAL = 0.05
+
+
+@dataclass
+class LaunchHandle:
+    """
+    A launched browser together with its startup timings (time.monotonic() values, in seconds) and its ephemeral
+    profile, if any.
+    """
+
+    process: subprocess.Popen
+    spawned_at: float
+    port: int | None = None
+    ready_at: float | None = None
+    profile: str | None = None
+    profile_time: float | None = None  # seconds spent creating the ephemeral profile
+
+    @property
+    def startup_time(self) -> float | None:
+        """
+        Seconds between spawning the process and the browser answering on its remote debugging port.
+        """
+        return None if self.ready_at is None else self.ready_at - self.spawned_at
+
+
+def launch_ready(
+    browser: str, path: str, args: Sequence[str], url: str | Sequence[str] | None, timeout: float, **kwargs: Any
+) -> LaunchHandle:
+    """
+    Launches a browser with remote debugging enabled and waits until the remote debugging port answers.
+
+    Chromium-based browsers are ready when the DevTools endpoint (/json/version) responds, other browsers
+    (e.g. the Firefox remote agent) when the port accepts connections.
+
+    :param kwargs: Passed to browsers._launch, e.g. new_window.
+    :raises TimeoutError: The browser was not ready within timeout seconds. The browser is terminated.
+    :raises RuntimeError: The browser exited before it was ready.
+    """
+    from . import _launch
+
+    if browser.startswith("safari"):
+        raise ValueError("Safari does not support remote debugging from the command line")
+
+    if (port := remote_debugging_port(args)) is None:
+        port = free_port()
+        args = [*args, *remote_debugging_args(browser, port)]
+
+    spawned_at = time.monotonic()
+    handle = LaunchHandle(process=_launch(browser, path, args, url, **kwargs), spawned_at=spawned_at, port=port)
+    try:
+        handle.ready_at = wait_until_ready(handle.process, port, spawned_at + timeout, browser_family(browser))
+    except TimeoutError:
+        handle.process.kill()
+        handle.process.wait()
+        raise
+    return handle
+
+
+def wait_until_ready(process: subprocess.Popen, port: int, deadline: float, family: str | None = None) -> float:
+    """
+    Polls the remote debugging port on localhost until it answers and returns the time.monotonic() it did.
+    """
+    while True:
+        if process.poll() is not None:
+            raise RuntimeError(f"Browser exited with code {process.returncode} before it was ready")
+
+        if _is_listening(port) and (family != "chromium" or _devtools_answers(port)):
+            return time.monotonic()
+
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Browser was not ready on port {port}")
+        time.sleep(POLL_INTERVAL)
+
+
+def remote_debugging_args(browser: str, port: int) -> list[str]:
+    """
+    >>> remote_debugging_args("chrome", 9222), remote_debugging_args("firefox", 9222)
+    (['--remote-debugging-port=9222'], ['--remote-debugging-port', '9222'])
+    """
+    if browser_family(browser) == "gecko":
+        return ["--remote-debugging-port", str(port)]
+    return [f"--remote-debugging-port={port}"]
+
+
+def remote_debugging_port(args: Sequence[str]) -> int | None:
+    """
+    Returns the remote debugging port already passed in the arguments.
+
+    >>> remote_debugging_port(["--headless", "--remote-debugging-port=9333"])
+    9333
+    >>> remote_debugging_port(["--remote-debugging-port", "9444"])
+    9444
+    >>> remote_debugging_port(["--remote-debugging-port=0"]) is None
+    True
+    """
+    for i, arg in enumerate(args):
+        name, _, value = arg.partition("=")
+        if name not in ("--remote-debugging-port", "-remote-debugging-port"):
+            continue
+        if not value and i + 1 < len(args):
+            value = args[i + 1]
+        if value.isdigit() and int(value):
+            return int(value)
+    return None
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _is_listening(port: int) -> bool:
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=POLL_INTERVAL):
+            return True
+    except OSError:
+        return False
+
+
+def _devtools_answers(port: int) -> bool:
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/json/version", timeout=1) as response:
+            return response.status == 200
+    except (OSError, urllib.error.URLError, ValueError):
+        return False
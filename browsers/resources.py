@@ -0,0 +1,96 @@
+import os
+import sys
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+
+if sys.platform != "win32":
+    import resource  # not imported in the preexec_fn, which runs between fork and exec
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+
+@dataclass(frozen=True)
+class ResourceLimits:
+    """
+    Resource controls applied to a browser when it is spawned, which are inherited by all of its child processes.
+
+    Limits apply to the launched process itself, for Safari this is `open` rather than the browser.
+
+    :param cpus: CPUs the browser may run on (Linux only).
+    :param nice: Niceness added to the current one.
+    :param io_class: I/O scheduling class passed to ionice (1: realtime, 2: best-effort, 3: idle, Linux only).
+    :param io_priority: I/O priority within the class, from 0 (highest) to 7 (Linux only).
+    :param address_space: Maximum size of the virtual memory in bytes (RLIMIT_AS).
+    :param open_files: Maximum number of open file descriptors (RLIMIT_NOFILE).
+    :param cgroup: cgroup v2 (relative to CGROUP_ROOT, e.g. "browsers.slice/crawler") to move the browser into. The
+                   cgroup must exist and be writable by the current user, otherwise the launched process exits with
+                   an error (Linux only).
+    """
+
+    cpus: Sequence[int] | None = None
+    nice: int | None = None
+    io_class: int | None = None
+    io_priority: int | None = None
+    address_space: int | None = None
+    open_files: int | None = None
+    cgroup: str | None = None
+
+    def __post_init__(self) -> None:
+        if sys.platform == "win32":
+            raise ValueError("Resource limits are not supported on Windows")
+        if sys.platform != "linux" and (
+            self.cpus is not None or self.io_class is not None or self.io_priority is not None or self.cgroup
+        ):
+            raise ValueError("CPU affinity, I/O scheduling and cgroups are only supported on Linux")
+
+    def command(self, command: list[str]) -> list[str]:
+        """
+        Returns the command wrapped with ionice if an I/O class or priority is set, and with a shell which moves itself
+        into the cgroup before it is replaced by the command if a cgroup is set.
+        """
+        if self.io_class is not None or self.io_priority is not None:
+            ionice = ["ionice"]
+            if self.io_class is not None:
+                ionice += ["-c", str(self.io_class)]
+            if self.io_priority is not None:
+                ionice += ["-n", str(self.io_priority)]
+            command = [*ionice, *command]
+
+        if self.cgroup is not None:
+            procs = os.path.join(CGROUP_ROOT, self.cgroup, "cgroup.procs")
+            # writing 0 moves the writing process, i.e. the shell
+            command = ["/bin/sh", "-c", 'printf 0 > "$1" && shift && exec "$@"', "sh", procs, *command]
+        return command
+
+    def preexec_fn(self) -> Callable[[], None] | None:
+        """
+        Returns the function which applies the remaining limits to the spawned process (the preexec_fn of
+        subprocess.Popen), or None if there are none.
+
+        It runs between fork and exec, where other threads (e.g. version probes) may have held locks at the time of the
+        fork, so it only makes system calls with values computed here.
+        """
+        if sys.platform != "win32":
+            cpus = set(self.cpus) if self.cpus is not None else None
+            nice = self.nice
+            rlimits = [
+                (limit, (value, resource.getrlimit(limit)[1]))
+                for limit, value in (
+                    (resource.RLIMIT_AS, self.address_space),
+                    (resource.RLIMIT_NOFILE, self.open_files),
+                )
+                if value is not None
+            ]
+            if cpus is None and nice is None and not rlimits:
+                return None
+
+            def apply() -> None:
+                if sys.platform == "linux" and cpus is not None:
+                    os.sched_setaffinity(0, cpus)
+                if nice is not None:
+                    os.nice(nice)
+                for limit, limits in rlimits:
+                    resource.setrlimit(limit, limits)
+
+            return apply
+        return None
@@ -0,0 +1,114 @@
+"""
+Offline inventory of Linux root filesystems, e.g. extracted container images or mounted VM disk images.
+
+Paths inside a root are resolved as if the root was "/", so absolute symlinks and ".." never leave it. Nothing in a
+root is executed, versions are only read from the installation files (see browsers.versions).
+"""
+
+import errno
+import os
+import stat
+from collections.abc import Iterable, Iterator
+
+from .common import Browser
+
+# searched for desktop entries in order of priority, user directories are not scanned
+ROOT_APPLICATION_DIRS = (
+    "/usr/local/share/applications",
+    "/usr/share/applications",
+    "/var/lib/snapd/desktop/applications",
+    "/var/lib/flatpak/exports/share/applications",
+)
+
+# $PATH used to find the commands of desktop entries
+ROOT_PATH = ("/usr/local/sbin", "/usr/local/bin", "/usr/sbin", "/usr/bin", "/sbin", "/bin", "/snap/bin")
+
+MAX_SYMLINKS = 40
+
+
+def resolve(root: str, path: str) -> str:
+    """
+    Returns the host path of an absolute path inside root with all symlinks resolved inside root.
+
+    :raises OSError: Too many levels of symbolic links.
+    """
+    pending = [part for part in reversed(path.split("/")) if part]
+    resolved: list[str] = []
+    symlinks = 0
+    while pending:
+        part = pending.pop()
+        if part == ".":
+            continue
+        if part == "..":
+            if resolved:
+                resolved.pop()
+            continue
+
+        try:
+            target = os.readlink(os.path.join(root, *resolved, part))
+        except OSError:  # not a symlink or missing
+            resolved.append(part)
+            continue
+
+        symlinks += 1
+        if symlinks > MAX_SYMLINKS:
+            raise OSError(errno.ELOOP, os.strerror(errno.ELOOP), path)
+        if target.startswith("/"):
+            resolved.clear()
+        pending.extend(part for part in reversed(target.split("/")) if part)
+    return os.path.join(root, *resolved)
+
+
+def host_path(root: str, path: str) -> str:
+    """
+    Returns the host path of an absolute path inside root, resolving the symlinks of its parent directories only.
+    """
+    return os.path.join(resolve(root, os.path.dirname(path)), os.path.basename(path))
+
+
+def exists(root: str, path: str) -> bool:
+    try:
+        return os.path.exists(resolve(root, path))
+    except OSError:
+        return False
+
+
+def which(root: str, command: str) -> str | None:
+    """
+    Returns the path inside root of an executable command, searched in ROOT_PATH if it is not a path.
+    """
+    for path in [command] if "/" in command else [f"{directory}/{command}" for directory in ROOT_PATH]:
+        try:
+            mode = os.stat(resolve(root, path)).st_mode
+        except OSError:
+            continue
+        if stat.S_ISREG(mode) and mode & 0o111:
+            return path
+    return None
+
+
+def scan_roots(
+    roots: Iterable[str], browser_type: str | None = None, max_workers: int | None = None
+) -> Iterator[tuple[str, list[Browser]]]:
+    """
+    Scans many roots in parallel in a process pool and yields each root with its browsers as soon as it is scanned.
+
+    :param roots: Directories at which Linux root filesystems are mounted.
+    :param browser_type: Only yield browsers of this type.
+    :param max_workers: Maximum number of processes (defaults to ProcessPoolExecutor's default).
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    executor = ProcessPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {executor.submit(_scan_root, root, browser_type): root for root in roots}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _scan_root(root: str, browser_type: str | None) -> list[Browser]:
+    from .linux import root_browsers
+
+    return list(root_browsers(root, browser_type))
@@ -0,0 +1,147 @@
+"""
+Hooks receiving the duration of each detection stage and counters, e.g. to find out where a slow scan spends its time.
+
+    >>> from browsers import tracing
+    >>> with tracing.recording() as recorder:
+    ...     tracing.count(tracing.FILES_SCANNED, "/usr/share/applications/firefox.desktop")
+    >>> recorder.counters
+    Counter({'files_scanned': 1})
+
+Hooks are process-wide and called from the threads doing the work. Instrumented code only reads the clock when a hook
+is registered.
+"""
+
+import contextlib
+import logging
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+FILES_SCANNED = "files_scanned"
+FILES_REJECTED = "files_rejected"
+PROBES_SPAWNED = "probes_spawned"
+PROBE_TIMEOUTS = "probe_timeouts"
+
+
+@dataclass(frozen=True)
+class StageEvent:
+    """
+    A stage (e.g. "linux.parse" or "osx.mdfind") completed for a candidate (desktop file, executable, bundle ID, ...).
+    """
+
+    stage: str
+    duration: float
+    candidate: str | None = None
+
+
+@dataclass(frozen=True)
+class CounterEvent:
+    counter: str
+    value: int = 1
+    candidate: str | None = None
+
+
+Event = StageEvent | CounterEvent
+Hook = Callable[[Event], None]
+
+# replaced instead of mutated so instrumented code can iterate it without a lock
+HOOKS: tuple[Hook, ...] = ()
+_hooks_lock = threading.Lock()
+
+
+def add_hook(hook: Hook) -> None:
+    global HOOKS
+
+    with _hooks_lock:
+        HOOKS = (*HOOKS, hook)
+
+
+def remove_hook(hook: Hook) -> None:
+    global HOOKS
+
+    with _hooks_lock:
+        hooks = list(HOOKS)
+        hooks.remove(hook)
+        HOOKS = tuple(hooks)
+
+
+@contextlib.contextmanager
+def hook(callback: Hook) -> Iterator[Hook]:
+    """
+    Registers a hook for the duration of the with block.
+    """
+    add_hook(callback)
+    try:
+        yield callback
+    finally:
+        remove_hook(callback)
+
+
+class Recorder:
+    """
+    A hook which keeps all events and sums the counters.
+    """
+
+    def __init__(self) -> None:
+        self.events: list[Event] = []
+        self.counters: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, event: Event) -> None:
+        with self._lock:
+            self.events.append(event)
+            if isinstance(event, CounterEvent):
+                self.counters[event.counter] += event.value
+
+    def durations(self) -> dict[str, float]:
+        """
+        Returns the total duration of each stage. Stages running in parallel (e.g. version probes) are summed.
+        """
+        durations: dict[str, float] = {}
+        with self._lock:
+            for event in self.events:
+                if isinstance(event, StageEvent):
+                    durations[event.stage] = durations.get(event.stage, 0.0) + event.duration
+        return durations
+
+
+@contextlib.contextmanager
+def recording() -> Iterator[Recorder]:
+    """
+    Records the events of the with block.
+    """
+    recorder = Recorder()
+    with hook(recorder):
+        yield recorder
+
+
+def clock() -> float:
+    """
+    Returns the start time to pass to stage(), or 0 if no hook is registered.
+    """
+    return time.perf_counter() if HOOKS else 0.0
+
+
+def stage(name: str, start: float, candidate: str | None = None) -> None:
+    """
+    Emits a StageEvent for a stage which started at start (see clock()).
+    """
+    if HOOKS and start:
+        _emit(StageEvent(name, time.perf_counter() - start, candidate))
+
+
+def count(counter: str, candidate: str | None = None, value: int = 1) -> None:
+    if HOOKS:
+        _emit(CounterEvent(counter, value, candidate))
+
+
+def _emit(event: Event) -> None:
+    for callback in HOOKS:
+        try:
+            callback(event)
+        except Exception:
+            logger.exception("Tracing hook %r failed", callback)
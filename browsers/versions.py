@@ -0,0 +1,251 @@
+import mmap
+import os
+import re
+import struct
+from collections.abc import Callable
+
+from . import roots
+
+VersionReader = Callable[[str], str]
+
+VERSION_DIRECTORY_PATTERN = re.compile(r"^\d+\.\d+\.\d+\.\d+$")
+
+# Chromium's PRODUCT_VERSION is always MAJOR.0.BUILD.PATCH and is stored as a NUL-terminated string.
+# Searching for the ".0.BUILD.PATCH" suffix first lets the regex engine skip ahead using the literal ".0." prefix.
+EMBEDDED_CHROMIUM_VERSION_SUFFIX_PATTERN = re.compile(rb"\.0\.\d{4,5}\.\d{1,4}\x00")
+EMBEDDED_CHROMIUM_VERSION_PATTERN = re.compile(rb"[\x00 /](\d{2,4}\.0\.\d{4,5}\.\d{1,4})\x00")
+
+CHROMIUM_BINARY_NAMES = ("chrome", "chromium", "msedge")
+
+# the newest release comes first in AppStream metadata
+APPSTREAM_RELEASE_PATTERN = re.compile(rb"<release\s[^>]*?\bversion=[\"']([^\"']+)[\"']")
+
+
+def read_static_version(browser_type: str, executable_path: str, root: str | None = None) -> str:
+    """
+    Reads the version of a browser from its installation files without executing it.
+
+    :param browser_type: Browser key used to select the readers from STATIC_VERSION_READERS.
+    :param executable_path: Path to the browser executable, symlinks are resolved.
+    :param root: Root filesystem containing the executable path, symlinks are resolved inside it (see browsers.roots).
+    :return: Version string or an empty string if none of the readers found it.
+    """
+    if packaging := package_type(executable_path, root):
+        # running the launcher of a sandboxed package starts its runtime, which is too slow to probe
+        try:
+            return PACKAGE_VERSION_READERS[packaging](
+                executable_path if root is None else roots.host_path(root, executable_path)
+            )
+        except (OSError, ValueError):
+            return ""
+
+    readers = STATIC_VERSION_READERS.get(browser_type) or STATIC_VERSION_READERS.get(browser_type.split("-")[0], ())
+    if not readers:
+        return ""
+
+    try:
+        real_path = os.path.realpath(executable_path) if root is None else roots.resolve(root, executable_path)
+    except OSError:
+        return ""
+    for reader in readers:
+        try:
+            if version := reader(real_path):
+                return version
+        except (OSError, ValueError, struct.error):
+            continue
+    return ""
+
+
+def package_type(executable_path: str, root: str | None = None) -> str | None:
+    """
+    Returns "snap" or "flatpak" if the executable is the launcher of a sandboxed package, otherwise None.
+
+    >>> package_type("/var/lib/flatpak/exports/bin/org.mozilla.firefox"), package_type("/usr/bin/firefox")
+    ('flatpak', None)
+    """
+    bin_dir = os.path.dirname(executable_path)
+    if os.path.basename(bin_dir) == "bin" and os.path.basename(os.path.dirname(bin_dir)) == "exports":
+        return "flatpak"
+    try:
+        real_path = os.path.realpath(executable_path) if root is None else roots.resolve(root, executable_path)
+    except OSError:
+        return None
+    if os.path.basename(real_path) == "snap":  # /snap/bin/* are symlinks to /usr/bin/snap
+        return "snap"
+    return None
+
+
+def read_snap_version(executable_path: str) -> str:
+    """
+    Reads the version of the current revision of a snap from its meta/snap.yaml, e.g.
+    /snap/firefox/current/meta/snap.yaml for /snap/bin/firefox (or /snap/bin/firefox.geckodriver).
+    """
+    with open(_snap_yaml_path(executable_path), encoding="utf-8", errors="replace") as f:
+        for line in f:
+            key, separator, value = line.partition(":")
+            if separator and key == "version":  # top-level keys are not indented
+                return value.strip().strip("'\"")
+    return ""
+
+
+def read_flatpak_version(executable_path: str) -> str:
+    """
+    Reads the newest release from the AppStream metadata of the active deployment of a Flatpak app, e.g.
+    /var/lib/flatpak/app/org.mozilla.firefox/current/active/files/share/metainfo/org.mozilla.firefox.metainfo.xml
+    for /var/lib/flatpak/exports/bin/org.mozilla.firefox.
+    """
+    for path in _flatpak_metainfo_paths(executable_path):
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            continue
+        if match := APPSTREAM_RELEASE_PATTERN.search(data):
+            return match[1].decode(errors="replace")
+    return ""
+
+
+def package_metadata_path(executable_path: str) -> str | None:
+    """
+    Returns the file the version of a sandboxed package is read from, or None if the executable is not the launcher
+    of a package with one. Unlike the launchers, which are shared by all snaps, it changes on every package update.
+    """
+    packaging = package_type(executable_path)
+    if packaging == "snap":
+        return _snap_yaml_path(executable_path)
+    if packaging == "flatpak":
+        return next((path for path in _flatpak_metainfo_paths(executable_path) if os.path.exists(path)), None)
+    return None
+
+
+def _snap_yaml_path(executable_path: str) -> str:
+    snap_dir = os.path.dirname(os.path.dirname(executable_path))
+    name = os.path.basename(executable_path).split(".")[0]
+    return os.path.join(snap_dir, name, "current", "meta", "snap.yaml")
+
+
+def _flatpak_metainfo_paths(executable_path: str) -> tuple[str, ...]:
+    installation_dir = os.path.dirname(os.path.dirname(os.path.dirname(executable_path)))
+    app_id = os.path.basename(executable_path)
+    share_dir = os.path.join(installation_dir, "app", app_id, "current", "active", "files", "share")
+    return (
+        os.path.join(share_dir, "metainfo", f"{app_id}.metainfo.xml"),
+        os.path.join(share_dir, "metainfo", f"{app_id}.appdata.xml"),
+        os.path.join(share_dir, "appdata", f"{app_id}.appdata.xml"),
+    )
+
+
+def read_application_ini(executable_path: str) -> str:
+    """
+    Reads Version from the [App] group of application.ini next to a Gecko-based browser.
+    """
+    return _read_ini_value(os.path.join(os.path.dirname(executable_path), "application.ini"), "App", "Version")
+
+
+def read_platform_ini(executable_path: str) -> str:
+    """
+    Reads Milestone from the [Build] group of platform.ini next to a Gecko-based browser.
+    """
+    return _read_ini_value(os.path.join(os.path.dirname(executable_path), "platform.ini"), "Build", "Milestone")
+
+
+def read_version_directory(executable_path: str) -> str:
+    """
+    Returns the newest version-named directory next to a Chromium-based browser (e.g. 120.0.6099.109/).
+    """
+    versions = [
+        entry.name
+        for entry in os.scandir(os.path.dirname(executable_path))
+        if entry.is_dir() and VERSION_DIRECTORY_PATTERN.match(entry.name)
+    ]
+    if not versions:
+        return ""
+    return max(versions, key=lambda version: tuple(map(int, version.split("."))))
+
+
+def read_embedded_version(executable_path: str) -> str:
+    """
+    Searches the read-only data of a Chromium-based browser binary for its version string using mmap.
+
+    Wrapper scripts (e.g. /opt/google/chrome/google-chrome) are skipped in favor of the binary next to them.
+    """
+    for path in (executable_path, *(os.path.join(os.path.dirname(executable_path), n) for n in CHROMIUM_BINARY_NAMES)):
+        if not os.path.isfile(path):
+            continue
+
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if mapped[:2] == b"#!":
+                continue
+
+            start, end = _elf_section(mapped, b".rodata") or (0, len(mapped))
+            for suffix in EMBEDDED_CHROMIUM_VERSION_SUFFIX_PATTERN.finditer(mapped, start, end):
+                for major_digits in range(2, 5):
+                    position = suffix.start() - major_digits - 1
+                    if match := EMBEDDED_CHROMIUM_VERSION_PATTERN.match(mapped, max(position, start), suffix.end()):
+                        return match[1].decode()
+    return ""
+
+
+def _read_ini_value(path: str, group: str, key: str) -> str:
+    header = f"[{group}]"
+    in_group = False
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("["):
+                if in_group:
+                    break
+                in_group = line == header
+            elif in_group and line.startswith(f"{key}="):
+                return line[len(key) + 1 :].strip()
+    return ""
+
+
+def _elf_section(mapped: mmap.mmap, name: bytes) -> tuple[int, int] | None:
+    """
+    Returns the start and end offsets of an ELF section or None if the file is not ELF or the section is missing.
+    """
+    if mapped[:4] != b"\x7fELF":
+        return None
+
+    is_64_bit = mapped[4] == 2
+    endian = "<" if mapped[5] == 1 else ">"
+    if is_64_bit:
+        (section_headers,) = struct.unpack_from(f"{endian}Q", mapped, 0x28)
+        header_size, header_count, names_index = struct.unpack_from(f"{endian}HHH", mapped, 0x3A)
+        header_format = f"{endian}IIQQQQ"
+    else:
+        (section_headers,) = struct.unpack_from(f"{endian}I", mapped, 0x20)
+        header_size, header_count, names_index = struct.unpack_from(f"{endian}HHH", mapped, 0x2E)
+        header_format = f"{endian}IIIIII"
+
+    *_, names_offset, _ = struct.unpack_from(header_format, mapped, section_headers + names_index * header_size)
+    for i in range(header_count):
+        name_offset, *_, offset, size = struct.unpack_from(header_format, mapped, section_headers + i * header_size)
+        start = names_offset + name_offset
+        if mapped[start : start + len(name) + 1] == name + b"\x00":
+            return offset, offset + size
+    return None
+
+
+PACKAGE_VERSION_READERS: dict[str, VersionReader] = {
+    "flatpak": read_flatpak_version,
+    "snap": read_snap_version,
+}
+
+GECKO_VERSION_READERS: tuple[VersionReader, ...] = (read_application_ini, read_platform_ini)
+CHROMIUM_VERSION_READERS: tuple[VersionReader, ...] = (read_version_directory, read_embedded_version)
+
+# Readers are only registered for browsers whose installation files carry the same version as `--version` prints.
+# Browser keys are looked up as-is first, then by their prefix (e.g. "chrome-dev" uses the "chrome" readers).
+STATIC_VERSION_READERS: dict[str, tuple[VersionReader, ...]] = {
+    "chrome": CHROMIUM_VERSION_READERS,
+    "chromium": CHROMIUM_VERSION_READERS,
+    "firefox": GECKO_VERSION_READERS,
+    "floorp": GECKO_VERSION_READERS,
+    "librewolf": GECKO_VERSION_READERS,
+    "msedge": CHROMIUM_VERSION_READERS,
+    "ungoogled-chromium": CHROMIUM_VERSION_READERS,
+    "waterfox": GECKO_VERSION_READERS,
+    "zen": GECKO_VERSION_READERS,
+}
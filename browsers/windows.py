@@ -1,11 +1,9 @@
 import contextlib
-import ctypes
 import os
-import shlex
 import sys
 from collections.abc import Iterator
-from ctypes import wintypes
 
+from . import pe, tracing
 from .common import Browser
 
 WINDOWS_REGISTRY_BROWSER_NAMES = {
@@ -34,23 +32,35 @@ WINDOWS_REGISTRY_BROWSER_NAMES = {
 }
 
 
-def browsers() -> Iterator[Browser]:  # type: ignore[return]
+def browsers(browser_type: str | None = None) -> Iterator[Browser]:  # type: ignore[return]
+    """
+    Iterates over browsers registered in Software\\Clients\\StartMenuInternet.
+
+    :param browser_type: Only read the file versions of and yield browsers of this type.
+    """
     if sys.platform == "win32":
         import winreg
 
-        yield from _win32_browsers_from_registry(winreg.HKEY_CURRENT_USER, winreg.KEY_READ)
-        yield from _win32_browsers_from_registry(winreg.HKEY_LOCAL_MACHINE, winreg.KEY_READ | winreg.KEY_WOW64_64KEY)
-        yield from _win32_browsers_from_registry(winreg.HKEY_LOCAL_MACHINE, winreg.KEY_READ | winreg.KEY_WOW64_32KEY)
+        for tree, access in (
+            (winreg.HKEY_CURRENT_USER, winreg.KEY_READ),
+            (winreg.HKEY_LOCAL_MACHINE, winreg.KEY_READ | winreg.KEY_WOW64_64KEY),
+            (winreg.HKEY_LOCAL_MACHINE, winreg.KEY_READ | winreg.KEY_WOW64_32KEY),
+        ):
+            yield from _win32_browsers_from_registry(tree, access, browser_type)
 
 
-def _win32_browsers_from_registry(tree: int, access: int) -> Iterator[Browser]:  # type: ignore[return]
+def _win32_browsers_from_registry(  # type: ignore[return]
+    tree: int, access: int, browser_type: str | None = None
+) -> Iterator[Browser]:
     if sys.platform == "win32":
+        import shlex
         import winreg
 
         with contextlib.suppress(FileNotFoundError):
             with winreg.OpenKey(tree, r"Software\Clients\StartMenuInternet", access=access) as hkey:
                 i = 0
                 while True:
+                    start = tracing.clock()
                     try:
                         subkey = winreg.EnumKey(hkey, i)
                         i += 1
@@ -64,66 +74,33 @@ def _win32_browsers_from_registry(tree: int, access: int) -> Iterator[Browser]:
                     except OSError:  # pragma: no cover
                         display_name = subkey
 
+                    entry_browser_type = WINDOWS_REGISTRY_BROWSER_NAMES.get(display_name, "unknown")
+                    if browser_type not in (None, entry_browser_type):
+                        continue
+
                     try:
                         cmd = winreg.QueryValue(hkey, rf"{subkey}\shell\open\command")
                         cmd = shlex.split(cmd, posix=False)[0].strip('"')
                         os.stat(cmd)
                     except (OSError, AttributeError, TypeError, ValueError, IndexError):  # pragma: no cover
                         continue
+                    finally:
+                        if tracing.HOOKS:
+                            tracing.stage("windows.registry", start, subkey)
+
+                    start = tracing.clock()
+                    version = _get_file_version(cmd)
+                    if tracing.HOOKS:
+                        tracing.stage("windows.file_version", start, cmd)
+                        tracing.count(tracing.FILES_SCANNED, cmd)
 
                     yield Browser(
-                        browser_type=WINDOWS_REGISTRY_BROWSER_NAMES.get(display_name, "unknown"),
+                        browser_type=entry_browser_type,
                         path=cmd,
                         display_name=display_name,
-                        version=_get_file_version(cmd),
+                        version=version,
                     )
 
 
-class VS_FIXEDFILEINFO(ctypes.Structure):
-    _fields_ = [
-        ("dwSignature", wintypes.DWORD),
-        ("dwStrucVersion", wintypes.DWORD),
-        ("dwFileVersionMS", wintypes.DWORD),
-        ("dwFileVersionLS", wintypes.DWORD),
-        ("dwProductVersionMS", wintypes.DWORD),
-        ("dwProductVersionLS", wintypes.DWORD),
-        ("dwFileFlagsMask", wintypes.DWORD),
-        ("dwFileFlags", wintypes.DWORD),
-        ("dwFileOS", wintypes.DWORD),
-        ("dwFileType", wintypes.DWORD),
-        ("dwFileSubtype", wintypes.DWORD),
-        ("dwFileDateMS", wintypes.DWORD),
-        ("dwFileDateLS", wintypes.DWORD),
-    ]
-
-
 def _get_file_version(file_path: str) -> str:
-    if sys.platform == "win32":
-        if not (size := ctypes.windll.version.GetFileVersionInfoSizeW(file_path, None)):
-            return ""
-
-        buffer = ctypes.create_string_buffer(size)
-
-        if not ctypes.windll.version.GetFileVersionInfoW(file_path, 0, size, buffer):
-            return ""
-
-        lplp_buffer = ctypes.c_void_p()
-        u_len = wintypes.UINT()
-        ctypes.windll.version.VerQueryValueW(buffer, "\\", ctypes.byref(lplp_buffer), ctypes.byref(u_len))
-
-        if not lplp_buffer.value:
-            return ""
-
-        ffi = ctypes.cast(lplp_buffer.value, ctypes.POINTER(VS_FIXEDFILEINFO)).contents
-
-        dw_file_version_ms = ffi.dwFileVersionMS
-        dw_file_version_ls = ffi.dwFileVersionLS
-
-        major = (dw_file_version_ms >> 16) & 0xFFFF
-        minor = dw_file_version_ms & 0xFFFF
-        build = (dw_file_version_ls >> 16) & 0xFFFF
-        revision = dw_file_version_ls & 0xFFFF
-
-        return f"{major}.{minor}.{build}.{revision}"
-
-    return ""
+    return pe.file_version(file_path)
@@ -0,0 +1,49 @@
+import os
+import stat
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from browsers import linux
+
+FakeBrowser = Callable[..., Path]
+
+
+@pytest.fixture
+def applications_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """
+    An empty applications directory in $XDG_DATA_HOME which replaces the system desktop entry locations.
+    """
+    directory = tmp_path / "data-home" / "applications"
+    directory.mkdir(parents=True)
+    monkeypatch.setenv("XDG_DATA_HOME", str(directory.parent))
+    monkeypatch.setenv("XDG_DATA_DIRS", str(tmp_path / "data-dirs"))
+    monkeypatch.setattr(linux, "XDG_DATA_LOCATIONS", ())
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    return directory
+
+
+@pytest.fixture
+def fake_browser(tmp_path: Path, applications_dir: Path) -> FakeBrowser:
+    """
+    Creates a desktop entry and an executable which prints a version string.
+    """
+
+    def factory(name: str = "Firefox", version: str = "100.0", desktop_id: str = "firefox", delay: float = 0) -> Path:
+        executable = tmp_path / "bin" / desktop_id
+        executable.parent.mkdir(exist_ok=True)
+        executable.write_text(f"#!{sys.executable}\nimport time\ntime.sleep({delay})\nprint('{name} {version}')\n")
+        executable.chmod(executable.stat().st_mode | stat.S_IEXEC)
+        (applications_dir / f"{desktop_id}.desktop").write_text(
+            f"[Desktop Entry]\nName={name}\nExec={executable} %u\nCategories=Network;WebBrowser;\n"
+        )
+        return executable
+
+    return factory
+
+
+def touch(path: Path) -> None:
+    stat_result = path.stat()
+    os.utime(path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000_000))
@@ -0,0 +1,75 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+import browsers
+from browsers import linux
+
+from .conftest import FakeBrowser
+
+pytestmark = pytest.mark.skipif(sys.platform != "linux", reason="linux-only")
+
+
+def test_async_browsers_yields_in_completion_order(fake_browser: FakeBrowser) -> None:
+    fake_browser("Firefox", "100.0", "firefox", delay=1)
+    fake_browser("Chromium", "120.0", "chromium")
+
+    async def collect() -> list[str]:
+        return [b["browser_type"] async for b in browsers.async_browsers()]
+
+    assert asyncio.run(collect()) == ["chromium", "firefox"]
+
+
+def test_async_get_cancels_pending_probes(fake_browser: FakeBrowser) -> None:
+    fake_browser("Firefox", "100.0", "firefox", delay=3)
+    executable = fake_browser("Chromium", "120.0", "chromium")
+
+    start = time.perf_counter()
+    browser = asyncio.run(browsers.async_get("chromium"))
+
+    assert time.perf_counter() - start < 3
+    assert browser == {
+        "browser_type": "chromium",
+        "path": str(executable),
+        "display_name": "Chromium",
+        "version": "120.0",
+    }
+
+
+def test_async_launch(fake_browser: FakeBrowser) -> None:
+    fake_browser("Chromium", "120.0", "chromium")
+
+    async def launch() -> int | None:
+        process = await browsers.async_launch("chromium", url="https://example.com")
+        assert isinstance(process, asyncio.subprocess.Process)
+        return await process.wait()
+
+    assert asyncio.run(launch()) == 0
+    assert asyncio.run(browsers.async_launch("hello")) is None
+
+
+def test_probe_timeout_kills_children_of_launcher(
+    fake_browser: FakeBrowser, applications_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    fake_browser("Chromium", "120.0", "chromium")
+    # the background child keeps stdout open after the launcher was killed
+    launcher = applications_dir.parent / "firefox"
+    launcher.write_text("#!/bin/sh\nsleep 20 &\nsleep 20\n")
+    launcher.chmod(0o755)
+    (applications_dir / "firefox.desktop").write_text(
+        f"[Desktop Entry]\nName=Firefox\nExec={launcher} %u\nCategories=Network;WebBrowser;\n"
+    )
+    monkeypatch.setattr(linux, "PROBE_TIMEOUT", 0.5)
+
+    async def versions() -> list[str]:
+        return sorted([b["version"] async for b in browsers.async_browsers()])
+
+    start = time.perf_counter()
+    assert asyncio.run(versions()) == ["", "120.0"]
+    # the firefox probe is cancelled once chromium was found
+    browser = asyncio.run(browsers.async_get("chromium"))
+    assert browser is not None and browser["version"] == "120.0"
+    assert time.perf_counter() - start < 5
@@ -0,0 +1,94 @@
+import asyncio
+import subprocess
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+import browsers
+from browsers import cache, linux
+
+from .conftest import FakeBrowser, touch
+
+pytestmark = pytest.mark.skipif(sys.platform != "linux", reason="linux-only")
+
+
+def test_cache_serves_unchanged_entries(fake_browser: FakeBrowser) -> None:
+    executable = fake_browser("Firefox", "100.0")
+    expected = [{"browser_type": "firefox", "path": str(executable), "display_name": "Firefox", "version": "100.0"}]
+
+    assert list(browsers.browsers(cache=True)) == expected
+
+    with mock.patch("subprocess.Popen", side_effect=AssertionError("should not probe")):
+        assert list(browsers.browsers(cache=True)) == expected
+
+
+def test_cache_reprobes_changed_executable(fake_browser: FakeBrowser) -> None:
+    executable = fake_browser("Firefox", "100.0")
+    assert browsers.get("firefox", cache=True)["version"] == "100.0"  # type: ignore[index]
+
+    fake_browser("Firefox", "101.0")
+    touch(executable)
+
+    with mock.patch("subprocess.Popen", wraps=subprocess.Popen) as popen:
+        assert browsers.get("firefox", cache=True)["version"] == "101.0"  # type: ignore[index]
+    popen.assert_called_once()
+
+
+@pytest.mark.parametrize("asynchronous", (False, True), ids=("sync", "async"))
+def test_cache_skips_unresolved_versions(
+    fake_browser: FakeBrowser, monkeypatch: pytest.MonkeyPatch, asynchronous: bool
+) -> None:
+    async def async_versions() -> list[str]:
+        return [b["version"] async for b in browsers.async_browsers(cache=True)]
+
+    def versions() -> list[str]:
+        return asyncio.run(async_versions()) if asynchronous else [b["version"] for b in browsers.browsers(cache=True)]
+
+    fake_browser("Firefox", "100.0", delay=2)
+    monkeypatch.setattr(linux, "PROBE_TIMEOUT", 0.5)
+    assert versions() == [""]
+
+    monkeypatch.setattr(linux, "PROBE_TIMEOUT", 5)
+    assert versions() == ["100.0"]
+
+
+def test_cache_reprobes_refreshed_snap(tmp_path: Path, applications_dir: Path) -> None:
+    # all snap launchers are symlinks to /usr/bin/snap, which does not change when a snap is refreshed
+    snap_dir = tmp_path / "snap"
+    (snap_dir / "bin").mkdir(parents=True)
+    (tmp_path / "snap-launcher").mkdir()
+    (tmp_path / "snap-launcher" / "snap").write_text("#!/bin/sh\nsleep 30\n")
+    (tmp_path / "snap-launcher" / "snap").chmod(0o755)
+    (snap_dir / "bin" / "firefox").symlink_to(tmp_path / "snap-launcher" / "snap")
+    for revision, version in (("1", "124.0.2-1"), ("2", "125.0-1")):
+        (snap_dir / "firefox" / revision / "meta").mkdir(parents=True)
+        (snap_dir / "firefox" / revision / "meta" / "snap.yaml").write_text(f"name: firefox\nversion: '{version}'\n")
+    (snap_dir / "firefox" / "current").symlink_to("1")
+    (applications_dir / "firefox_firefox.desktop").write_text(
+        f"[Desktop Entry]\nName=Firefox Web Browser\nExec={snap_dir}/bin/firefox %u\nCategories=Network;WebBrowser;\n"
+    )
+    assert [b["version"] for b in browsers.browsers(cache=True)] == ["124.0.2-1"]
+
+    (snap_dir / "firefox" / "current").unlink()
+    (snap_dir / "firefox" / "current").symlink_to("2")
+
+    assert [b["version"] for b in browsers.browsers(cache=True)] == ["125.0-1"]
+
+
+def test_cache_skips_non_browsers(applications_dir: Path) -> None:
+    desktop_file = applications_dir / "vim.desktop"
+    desktop_file.write_text("[Desktop Entry]\nName=Vim\nExec=vim %F\nCategories=Utility;TextEditor;\n")
+
+    assert list(browsers.browsers(cache=True)) == []
+    assert cache.DetectionCache.load().lookup(str(desktop_file), cache.fingerprint(str(desktop_file))) == (True, None)
+
+
+def test_clear(fake_browser: FakeBrowser) -> None:
+    fake_browser()
+    list(browsers.browsers(cache=True))
+    assert Path(cache.cache_path()).exists()
+
+    cache.clear()
+    assert not Path(cache.cache_path()).exists()
@@ -0,0 +1,38 @@
+import pickle
+import sys
+
+import pytest
+
+from browsers import Browser, BrowserRecord
+
+
+def test_browser_record_is_a_compact_immutable_mapping() -> None:
+    calls = []
+
+    def resolve() -> str:
+        calls.append(1)
+        return "120.0"
+
+    record = BrowserRecord("chrome", "/snap/bin/chromium", "Chromium", resolve, "snap")
+    browser = Browser(browser_type="chrome", path="/snap/bin/chromium", display_name="Chromium", version="120.0")
+    browser["packaging"] = "snap"
+
+    assert record["path"] == "/snap/bin/chromium" and "version" in record and not calls
+    with pytest.raises(AttributeError):
+        record.version = "121.0"  # type: ignore[misc]
+    with pytest.raises(TypeError):
+        record["version"] = "121.0"  # type: ignore[index]
+    assert not hasattr(record, "__dict__")
+
+    assert record.to_browser() == browser == record
+    assert dict(record) == browser and record.get("missing") is None
+    assert calls == [1]
+    assert sys.getsizeof(record) < sys.getsizeof(dict(browser))
+
+    assert pickle.loads(pickle.dumps(record)) == record
+    assert list(BrowserRecord("firefox", "/usr/bin/firefox", "Firefox", "124.0")) == [
+        "browser_type",
+        "path",
+        "display_name",
+        "version",
+    ]
@@ -0,0 +1,95 @@
+import os
+import socket
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from browsers import Browser, Inventory, daemon
+
+from .conftest import FakeBrowser
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="unix-only")
+
+INSTALLED = [
+    Browser(browser_type="chrome", path="/opt/chrome-120/chrome", display_name="Google Chrome", version="120.0.1"),
+    Browser(browser_type="chrome", path="/opt/chrome-121/chrome", display_name="Google Chrome", version="121.0.1"),
+    Browser(browser_type="firefox", path="/usr/bin/firefox", display_name="Firefox", version="124.0.2"),
+]
+
+
+@pytest.fixture
+def socket_path(tmp_path: Path) -> Iterator[str]:
+    path = str(tmp_path / "pybrowsers.sock")
+    server = daemon.make_server(path, Inventory(scan=lambda: INSTALLED))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield path
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_queries(socket_path: str) -> None:
+    with daemon.Client(socket_path) as client:
+        assert client.browsers() == INSTALLED
+        assert client.browsers("firefox") == INSTALLED[2:]
+        assert client.get("chrome", ">=121") == INSTALLED[1]
+        assert client.get("opera") is None
+        with pytest.raises(ValueError, match="Invalid version"):
+            client.get("chrome", ">=abc")
+        assert client.refresh() == INSTALLED
+
+    assert daemon.get("firefox", path=socket_path) == INSTALLED[2]
+
+    start = time.perf_counter()
+    for _ in range(100):
+        daemon.get("chrome", path=socket_path)
+    assert (time.perf_counter() - start) / 100 < 0.01
+
+
+def test_fallback_without_daemon(tmp_path: Path, fake_browser: FakeBrowser) -> None:
+    fake_browser("Firefox", "124.0", "firefox")
+
+    path = str(tmp_path / "missing.sock")
+    with pytest.raises(OSError):
+        daemon.Client(path)
+    if sys.platform == "linux":
+        assert [b["version"] for b in daemon.browsers(path=path)] == ["124.0"]
+        assert daemon.get("firefox", "124.*", path=path) is not None
+
+
+def test_ignores_sockets_of_other_users(
+    socket_path: str, fake_browser: FakeBrowser, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    fake_browser("Firefox", "124.0", "firefox")
+    monkeypatch.setattr(os, "getuid", lambda: os.stat(socket_path).st_uid + 1)
+
+    with pytest.raises(OSError, match="not a socket of the current user"):
+        daemon.Client(socket_path)
+    if sys.platform == "linux":
+        assert [b["version"] for b in daemon.browsers(path=socket_path)] == ["124.0"]
+
+
+def test_stale_socket(socket_path: str, tmp_path: Path) -> None:
+    with pytest.raises(OSError, match="already listening"):
+        daemon.make_server(socket_path, Inventory(scan=lambda: INSTALLED))
+
+    stale = tmp_path / "stale.sock"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as closed:
+        closed.bind(str(stale))  # left behind without a listener
+    server = daemon.make_server(str(stale), Inventory(scan=lambda: INSTALLED))
+    server.server_close()
+    assert not stale.exists()
+
+
+def test_refuses_to_replace_other_files(tmp_path: Path) -> None:
+    notes = tmp_path / "notes.txt"
+    notes.write_text("keep me")
+
+    with pytest.raises(OSError, match="not a socket"):
+        daemon.make_server(str(notes), Inventory(scan=lambda: INSTALLED))
+    assert notes.read_text() == "keep me"
@@ -1,5 +1,4 @@
 import os
-import subprocess
 import sys
 import unittest.mock
 from typing import Any
@@ -8,6 +7,7 @@ from unittest.mock import ANY
 import pytest
 
 import browsers
+from browsers import osx
 
 """
 These tests are based on what browsers exists in Github Actions virtual environments.
@@ -162,8 +162,8 @@ def test_browsers(browser: str) -> None:
     ),
 )
 def test_get(naive: bool, browser: str, details: dict) -> None:
-    # if naive, mock subprocess.getoutput else just wrap it
-    kwargs: dict[str, Any] = {"return_value": ""} if naive else ({"wraps": subprocess.getoutput})
+    # if naive, mock the Spotlight query else just wrap it
+    kwargs: dict[str, Any] = {"return_value": []} if naive else ({"wraps": osx._mdfind})
 
-    with unittest.mock.patch("subprocess.getoutput", **kwargs):
+    with unittest.mock.patch("browsers.osx._mdfind", **kwargs):
         assert browsers.get(browser) == details
@@ -0,0 +1,63 @@
+import subprocess
+import sys
+
+# modules which must not be loaded by "import browsers" alone, i.e. before the first scan or launch
+DEFERRED_MODULES = (
+    "asyncio",
+    "browsers.aio",
+    "browsers.inventory",
+    "browsers.linux",
+    "browsers.osx",
+    "browsers.pool",
+    "browsers.readiness",
+    "browsers.windows",
+    "concurrent.futures",
+    "configparser",
+    "ctypes",
+    "plistlib",
+    "shlex",
+    "urllib.request",
+)
+
+# cumulative time of "import browsers" in seconds (including the standard library modules it imports)
+IMPORT_TIME_BUDGET = 0.1
+
+SCRIPT = """
+import logging
+import sys
+
+import browsers
+
+print(",".join(sorted(module for module in {modules!r} if module in sys.modules)))
+print(len(logging.getLogger().handlers), logging.getLogger().level)
+"""
+
+
+def test_import_is_lazy_and_side_effect_free() -> None:
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT.format(modules=DEFERRED_MODULES)], capture_output=True, text=True, check=True
+    )
+    loaded, root_logger = result.stdout.splitlines()
+
+    assert loaded == ""
+    assert root_logger == "0 30"  # no handlers, default WARNING level
+
+
+def test_import_time_budget() -> None:
+    def import_time() -> float:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import browsers"], capture_output=True, text=True, check=True
+        )
+        # e.g. "import time:      6600 |      43717 | browsers"
+        (cumulative,) = (line.split("|")[1] for line in result.stderr.splitlines() if line.endswith("| browsers"))
+        return int(cumulative) / 1e6
+
+    assert min(import_time() for _ in range(3)) < IMPORT_TIME_BUDGET  # best of 3 runs against noise
+
+
+def test_lazy_attributes() -> None:
+    import browsers
+    from browsers.inventory import Inventory
+
+    assert browsers.Inventory is Inventory
+    assert "BrowserPool" in dir(browsers)
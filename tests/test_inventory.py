@@ -0,0 +1,62 @@
+import threading
+import time
+from unittest import mock
+
+import browsers
+from browsers import Browser, Inventory
+
+CHROME = Browser(browser_type="chrome", path="/usr/bin/google-chrome", display_name="Google Chrome", version="120.0")
+
+
+def slow_scan() -> list[Browser]:
+    time.sleep(0.2)
+    return [CHROME]
+
+
+def test_memoizes_until_refresh() -> None:
+    scan = mock.Mock(return_value=[CHROME])
+    inventory = Inventory(scan=scan)
+
+    assert inventory.browsers() == [CHROME]
+    assert inventory.browsers() == [CHROME]
+    scan.assert_called_once()
+
+    inventory.refresh()
+    assert scan.call_count == 2
+
+
+def test_ttl() -> None:
+    scan = mock.Mock(return_value=[CHROME])
+    inventory = Inventory(ttl=0.1, scan=scan)
+
+    inventory.browsers()
+    inventory.browsers()
+    time.sleep(0.1)
+    inventory.browsers()
+    assert scan.call_count == 2
+
+
+def test_concurrent_callers_share_one_scan() -> None:
+    scan = mock.Mock(side_effect=slow_scan)
+    inventory = Inventory(scan=scan)
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(inventory.browsers())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [[CHROME]] * 8
+    scan.assert_called_once()
+
+
+def test_get_and_launch_use_inventory() -> None:
+    inventory = Inventory(scan=lambda: [CHROME])
+
+    assert browsers.get("chrome", "120.*", inventory=inventory) == CHROME
+    assert browsers.get("firefox", inventory=inventory) is None
+
+    with mock.patch.object(browsers, "_launch") as mock_launch:
+        browsers.launch("chrome", inventory=inventory)
+    mock_launch.assert_called_with("chrome", "/usr/bin/google-chrome", [], None)
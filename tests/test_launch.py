@@ -90,3 +90,52 @@ def test_firefox_command_construction(
 ) -> None:
     browsers._launch("firefox", "/usr/bin/firefox", args, url)
     mock_popen.assert_called_once_with(expected_command)
+
+
+@pytest.mark.parametrize(
+    "browser, new_window, expected_command",
+    (
+        pytest.param("chrome", False, ["/opt/browser", "https://a.com", "https://b.com"], id="chromium"),
+        pytest.param(
+            "chrome", True, ["/opt/browser", "https://a.com", "https://b.com", "--new-window"], id="chromium-window"
+        ),
+        pytest.param(
+            "librewolf",
+            False,
+            ["/opt/browser", "-new-tab", "https://a.com", "-new-tab", "https://b.com"],
+            id="gecko",
+        ),
+        pytest.param(
+            "firefox-developer",
+            True,
+            ["/opt/browser", "-new-window", "https://a.com", "-new-tab", "https://b.com"],
+            id="gecko-window",
+        ),
+        pytest.param(
+            "safari",
+            False,
+            ["open", "--wait-apps", "--new", "--fresh", "-a", "/opt/browser", "https://a.com", "https://b.com"],
+            id="safari",
+        ),
+    ),
+)
+@mock.patch("subprocess.Popen")
+def test_multiple_urls_command_construction(
+    mock_popen: mock.MagicMock, browser: str, new_window: bool, expected_command: list[str]
+) -> None:
+    browsers._launch(browser, "/opt/browser", [], ["https://a.com", "https://b.com"], new_window)
+    mock_popen.assert_called_once_with(expected_command)
+
+
+def test_launch_batches() -> None:
+    chrome = browsers.Browser(browser_type="chrome", path="/opt/chrome", display_name="Google Chrome", version="1.0")
+    inventory = browsers.Inventory(scan=lambda: [chrome])
+    urls = [f"https://example.com/{i}" for i in range(5)]
+
+    with mock.patch.object(browsers, "_launch") as mock_launch:
+        assert len(browsers.launch_batches("chrome", urls, 2, inventory=inventory)) == 3
+        assert browsers.launch_batches("firefox", urls, 2, inventory=inventory) == []
+    assert [call.args[3] for call in mock_launch.call_args_list] == [urls[0:2], urls[2:4], urls[4:]]
+
+    with pytest.raises(ValueError):
+        browsers.launch_batches("chrome", urls, 0, inventory=inventory)
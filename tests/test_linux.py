@@ -0,0 +1,225 @@
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+import pytest
+
+import browsers
+from browsers import linux
+
+from .conftest import FakeBrowser
+
+pytestmark = pytest.mark.skipif(sys.platform != "linux", reason="linux-only")
+
+FAKE_BROWSERS = (
+    ("Firefox", "firefox"),
+    ("Google Chrome", "google-chrome"),
+    ("Chromium", "chromium"),
+    ("Vivaldi", "vivaldi"),
+)
+
+
+def test_concurrent_probes(fake_browser: FakeBrowser) -> None:
+    for name, desktop_id in FAKE_BROWSERS:
+        fake_browser(name, "1.2.3", desktop_id, delay=0.5)
+
+    start = time.perf_counter()
+    concurrent = list(linux.browsers(max_workers=len(FAKE_BROWSERS)))
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.5 * len(FAKE_BROWSERS)
+    assert concurrent == list(linux.browsers(max_workers=1))
+    assert sorted(b["browser_type"] for b in concurrent) == ["chrome", "chromium", "firefox", "vivaldi"]
+
+
+def test_browser_type_filter_skips_other_probes(fake_browser: FakeBrowser) -> None:
+    for name, desktop_id in FAKE_BROWSERS:
+        fake_browser(name, "1.2.3", desktop_id)
+
+    with mock.patch("subprocess.Popen", wraps=subprocess.Popen) as popen:
+        assert browsers.get("vivaldi") is not None
+    assert [Path(call.args[0][0]).name for call in popen.call_args_list] == ["vivaldi"]
+    assert [b["browser_type"] for b in linux.browsers(browser_type="chromium")] == ["chromium"]
+
+
+def test_read_desktop_entry(tmp_path: Path) -> None:
+    desktop_file = tmp_path / "firefox.desktop"
+    desktop_file.write_text(
+        "# comment\n"
+        "[Desktop Entry]\n"
+        "Name=Firefox Web Browser\n"
+        "Name[de]=Firefox-Webbrowser\n"
+        "Exec=firefox %u\n"
+        "Categories=GNOME;GTK;Network;WebBrowser;\n"
+        "\n"
+        "[Desktop Action new-window]\n"
+        "Name=Open a New Window\n"
+        "Exec=firefox -new-window\n"
+    )
+    assert linux._read_desktop_entry(str(desktop_file)) == {
+        "Name": "Firefox Web Browser",
+        "Exec": "firefox %u",
+        "Categories": "GNOME;GTK;Network;WebBrowser;",
+    }
+
+    desktop_file.write_text("[Desktop Entry]\nName=Files\nComment=Web Browser integration\nCategories=Utility;\n")
+    assert linux._read_desktop_entry(str(desktop_file)) is None
+
+
+def test_application_dirs(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("XDG_DATA_HOME", "/home/user/.local/share")
+    monkeypatch.setenv("XDG_DATA_DIRS", "/usr/share/gnome:/usr/local/share/:/usr/share")
+    monkeypatch.setattr(linux, "XDG_DATA_LOCATIONS", ("/usr/share/applications", "/var/lib/snapd/desktop/applications"))
+
+    assert linux._application_dirs() == [
+        "/home/user/.local/share/applications",
+        "/usr/share/gnome/applications",
+        "/usr/local/share/applications",
+        "/usr/share/applications",
+        "/var/lib/snapd/desktop/applications",
+    ]
+
+
+def test_desktop_id_shadowing(tmp_path: Path, fake_browser: FakeBrowser) -> None:
+    fake_browser("Firefox", "100.0", "firefox")
+    nightly = fake_browser("Firefox", "101.0", "firefox-nightly")
+    (tmp_path / "data-home" / "applications" / "firefox-nightly.desktop").unlink()
+
+    system_dir = tmp_path / "data-dirs" / "applications" / "mozilla"
+    system_dir.mkdir(parents=True)
+    (system_dir / "nightly.desktop").write_text(
+        f"[Desktop Entry]\nName=Firefox\nExec={nightly}\nCategories=Network;WebBrowser;\n"
+    )
+    user_dir = tmp_path / "data-home" / "applications" / "mozilla"
+    user_dir.mkdir()
+    (user_dir / "nightly.desktop").write_text("[Desktop Entry]\nName=Firefox\nHidden=true\n")
+
+    assert sorted(linux._desktop_files(str(system_dir.parent))) == [
+        ("mozilla-nightly.desktop", str(system_dir / "nightly.desktop"))
+    ]
+    # the user's mozilla-nightly.desktop shadows the system one
+    assert [b["version"] for b in linux.browsers()] == ["100.0"]
+
+
+def test_executable_is_probed_once(applications_dir: Path, fake_browser: FakeBrowser) -> None:
+    executable = fake_browser("Google Chrome", "120.0", "google-chrome")
+    (applications_dir / "com.google.Chrome.desktop").write_text(
+        f"[Desktop Entry]\nName=Google Chrome\nExec={executable} %U\nCategories=Network;WebBrowser;\n"
+    )
+
+    with mock.patch("subprocess.Popen", wraps=subprocess.Popen) as popen:
+        assert [b["browser_type"] for b in linux.browsers()] == ["chrome"]
+    popen.assert_called_once()
+
+
+def test_unordered_yields_in_completion_order(fake_browser: FakeBrowser) -> None:
+    fake_browser("Firefox", "124.0", "firefox", delay=1)
+    fake_browser("Vivaldi", "6.5", "vivaldi")
+
+    assert [b["browser_type"] for b in linux.browsers(ordered=False)] == ["vivaldi", "firefox"]
+
+
+def test_get_kills_outstanding_probes(applications_dir: Path, fake_browser: FakeBrowser) -> None:
+    fake_browser("Google Chrome", "121.0", "google-chrome-slow", delay=30)
+    fake_browser("Google Chrome", "120.0", "google-chrome")
+
+    processes: list[subprocess.Popen] = []
+    real_popen = subprocess.Popen
+
+    def popen(*args: Any, **kwargs: Any) -> subprocess.Popen:
+        processes.append(process := real_popen(*args, **kwargs))
+        return process
+
+    start = time.perf_counter()
+    with mock.patch("subprocess.Popen", side_effect=popen):
+        assert browsers.get("chrome")["version"] == "120.0"  # type: ignore[index]
+    assert time.perf_counter() - start < 5
+
+    assert len(processes) == 2
+    for process in processes:
+        assert process.wait(timeout=5) is not None
+
+
+def test_get_prefers_resolved_versions(applications_dir: Path, fake_browser: FakeBrowser, tmp_path: Path) -> None:
+    executable = fake_browser("Google Chrome", "120.0", "google-chrome", delay=0.5)
+    broken = tmp_path / "bin" / "google-chrome-broken"
+    broken.write_text("#!/bin/sh\nexit 1\n")
+    broken.chmod(0o755)
+    (applications_dir / "google-chrome-broken.desktop").write_text(
+        f"[Desktop Entry]\nName=Google Chrome\nExec={broken} %U\nCategories=Network;WebBrowser;\n"
+    )
+
+    assert browsers.get("chrome") == {
+        "browser_type": "chrome",
+        "path": str(executable),
+        "display_name": "Google Chrome",
+        "version": "120.0",
+    }
+    executable.unlink()
+    assert browsers.get("chrome") == {
+        "browser_type": "chrome",
+        "path": str(broken),
+        "display_name": "Google Chrome",
+        "version": "",
+    }
+
+
+def test_lazy_records_probe_on_first_access(fake_browser: FakeBrowser) -> None:
+    fake_browser("Firefox", "124.0", "firefox")
+    fake_browser("Vivaldi", "6.5", "vivaldi")
+
+    with mock.patch("subprocess.Popen", wraps=subprocess.Popen) as popen:
+        records = list(browsers.browsers(lazy=True))
+        assert [r["browser_type"] for r in records] == ["firefox", "vivaldi"]
+        assert not any(r.resolved for r in records)
+        popen.assert_not_called()
+
+        assert records[1]["version"] == records[1].version == "6.5"
+        assert records[1].resolved and not records[0].resolved
+        popen.assert_called_once()
+
+        record = browsers.get("firefox", lazy=True)
+        assert record is not None and not record.resolved
+        assert popen.call_count == 1
+        assert browsers.get("firefox", ">=124", lazy=True) == records[0]
+    assert popen.call_count == 3
+
+
+def test_deadline_returns_partial_results(fake_browser: FakeBrowser) -> None:
+    slow = fake_browser("Firefox", "124.0", "firefox", delay=30)
+    fake_browser("Vivaldi", "6.5", "vivaldi")
+
+    deadline = browsers.Deadline(1)
+    start = time.perf_counter()
+    found = {b["browser_type"]: b["version"] for b in browsers.browsers(deadline=deadline)}
+    assert time.perf_counter() - start < 5
+
+    assert found == {"firefox": browsers.UNKNOWN_VERSION, "vivaldi": "6.5"}
+    assert deadline.timed_out == [str(slow)]
+    assert browsers.get("vivaldi", deadline=0) == {
+        "browser_type": "vivaldi",
+        "path": mock.ANY,
+        "display_name": "Vivaldi",
+        "version": browsers.UNKNOWN_VERSION,
+    }
+
+
+def test_probe_timeout_kills_children_of_launcher(applications_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # the background child keeps stdout open after the launcher was killed
+    launcher = applications_dir.parent / "firefox"
+    launcher.write_text("#!/bin/sh\nsleep 20 &\nsleep 20\n")
+    launcher.chmod(0o755)
+    (applications_dir / "firefox.desktop").write_text(
+        f"[Desktop Entry]\nName=Firefox\nExec={launcher} %u\nCategories=Network;WebBrowser;\n"
+    )
+    monkeypatch.setattr(linux, "PROBE_TIMEOUT", 0.5)
+
+    start = time.perf_counter()
+    assert [b["version"] for b in linux.browsers()] == [""]
+    deadline = browsers.Deadline(0.2)
+    assert [b["version"] for b in browsers.browsers(deadline=deadline)] == [browsers.UNKNOWN_VERSION]
+    assert time.perf_counter() - start < 5
+    assert deadline.timed_out == [str(launcher)]
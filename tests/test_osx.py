@@ -0,0 +1,145 @@
+import plistlib
+import stat
+import sys
+from pathlib import Path
+
+import pytest
+
+from browsers import osx
+from browsers.deadline import Deadline
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="the stub mdfind is a script")
+
+MDFIND = """\
+#!{python}
+import sys
+
+with open({log!r}, "a") as f:
+    f.write(sys.argv[1] + "\\n")
+print({output!r}, end="")
+"""
+
+
+def app_bundle(root: Path, name: str, plist: dict, binary: bool = False) -> Path:
+    app_dir = root / f"{name}.app"
+    (app_dir / "Contents" / "MacOS").mkdir(parents=True)
+    with open(app_dir / "Contents" / "Info.plist", "wb") as f:
+        plistlib.dump(plist, f, fmt=plistlib.FMT_BINARY if binary else plistlib.FMT_XML)
+    return app_dir
+
+
+def stub_mdfind(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, app_dirs: list[Path]) -> Path:
+    """
+    Puts an mdfind on $PATH which prints the application bundles and logs its queries.
+    """
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    log = tmp_path / "mdfind.log"
+    output = "".join(f"{app_dir}\n" for app_dir in app_dirs)
+    (bin_dir / "mdfind").write_text(MDFIND.format(python=sys.executable, log=str(log), output=output))
+    (bin_dir / "mdfind").chmod(stat.S_IRWXU)
+    monkeypatch.setenv("PATH", str(bin_dir))
+    return log
+
+
+@pytest.fixture
+def applications(tmp_path: Path) -> Path:
+    root = tmp_path / "Applications"
+    root.mkdir()
+    app_bundle(
+        root,
+        "Google Chrome",
+        {
+            "CFBundleIdentifier": "com.google.Chrome",
+            "CFBundleExecutable": "Google Chrome",
+            "CFBundleName": "Chrome",
+            "CFBundleDisplayName": "Google Chrome",
+            "CFBundleShortVersionString": "120.0.6099.109",
+            "LSMinimumSystemVersion": "10.15",
+        },
+        binary=True,
+    )
+    app_bundle(root, "Notes", {"CFBundleIdentifier": "com.apple.Notes", "CFBundleExecutable": "Notes"})
+    app_bundle(
+        root,
+        "Safari",
+        {
+            "CFBundleIdentifier": "com.apple.Safari",
+            "CFBundleExecutable": "Safari",
+            "CFBundleName": "Safari",
+            "CFBundleShortVersionString": "17.2",
+        },
+    )
+    return root
+
+
+def test_single_spotlight_query(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, applications: Path) -> None:
+    firefox = app_bundle(
+        tmp_path / "Elsewhere",
+        "Firefox",
+        {
+            "CFBundleIdentifier": "org.mozilla.firefox",
+            "CFBundleExecutable": "firefox",
+            "CFBundleName": "Firefox",
+            "CFBundleShortVersionString": "124.0.2",
+        },
+    )
+    log = stub_mdfind(tmp_path, monkeypatch, [applications / "Safari.app", firefox, applications / "Notes.app"])
+
+    # Spotlight results in the order of OSX_BROWSER_BUNDLE_LIST, then the remaining bundles in the roots
+    assert list(osx.browsers(roots=[str(applications)])) == [
+        {
+            "browser_type": "firefox",
+            "path": str(firefox / "Contents/MacOS/firefox"),
+            "display_name": "Firefox",
+            "version": "124.0.2",
+        },
+        {
+            "browser_type": "safari",
+            "path": str(applications / "Safari.app"),
+            "display_name": "Safari",
+            "version": "17.2",
+        },
+        {
+            "browser_type": "chrome",
+            "path": str(applications / "Google Chrome.app/Contents/MacOS/Google Chrome"),
+            "display_name": "Google Chrome",
+            "version": "120.0.6099.109",
+        },
+    ]
+    queries = log.read_text().splitlines()
+    assert len(queries) == 1
+    assert queries[0].count(" || ") == len(osx.OSX_BROWSER_BUNDLE_LIST) - 1
+    assert 'kMDItemCFBundleIdentifier == "org.mozilla.pale moon"' in queries[0]
+
+
+def test_roots_without_spotlight(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, applications: Path) -> None:
+    log = stub_mdfind(tmp_path, monkeypatch, [])
+
+    assert [b["browser_type"] for b in osx.browsers(roots=[str(applications)])] == ["chrome", "safari"]
+    assert [b["browser_type"] for b in osx.browsers("safari", roots=[str(applications)])] == ["safari"]
+    assert 'kMDItemCFBundleIdentifier == "com.apple.Safari"\n' in log.read_text().splitlines(keepends=True)
+    assert list(osx.browsers("unknown", roots=[str(applications)])) == []
+    assert len(log.read_text().splitlines()) == 2  # no query without bundle IDs
+
+    monkeypatch.setenv("PATH", str(tmp_path / "missing"))
+    assert [b["browser_type"] for b in osx.browsers(roots=[str(applications)])] == ["chrome", "safari"]
+
+
+def test_spotlight_deadline(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, applications: Path) -> None:
+    stub_mdfind(tmp_path, monkeypatch, [applications / "Safari.app"])
+
+    deadline = Deadline(0)
+    assert [b["browser_type"] for b in osx.browsers("safari", deadline, roots=[])] == []
+    assert deadline.timed_out == ["com.apple.Safari"]
+
+
+def test_plist_prefilter(applications: Path) -> None:
+    assert osx._load_plist(str(applications / "Notes.app/Contents/Info.plist")) is None
+    assert osx._load_plist(str(applications / "Google Chrome.app/Contents/Info.plist")) == {
+        "CFBundleIdentifier": "com.google.Chrome",
+        "CFBundleExecutable": "Google Chrome",
+        "CFBundleDisplayName": "Google Chrome",
+        "CFBundleName": "Chrome",
+        "CFBundleShortVersionString": "120.0.6099.109",
+    }
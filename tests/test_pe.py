@@ -0,0 +1,80 @@
+import os
+import struct
+from pathlib import Path
+
+import pytest
+
+from browsers import pe, windows
+
+RESOURCE_RVA = 0x1000
+RESOURCE_OFFSET = 0x200
+
+
+def build_pe(version: tuple[int, int, int, int] | None, pe32_plus: bool = True) -> bytes:
+    """
+    Builds a minimal PE image with one .rsrc section which holds a version resource.
+    """
+    major, minor, build, revision = version or (0, 0, 0, 0)
+    fixed_file_info = struct.pack(
+        "<13I", 0xFEEF04BD, 0x10000, major << 16 | minor, build << 16 | revision, major << 16 | minor, 0, *[0] * 7
+    )
+    key = "VS_VERSION_INFO\0".encode("utf-16-le")
+    version_info = struct.pack("<HHH", 6 + len(key) + 2 + len(fixed_file_info), len(fixed_file_info), 0) + key
+    version_info += b"\0\0" + fixed_file_info  # aligned to 32 bits
+
+    def directory(resource_id: int, offset: int, subdirectory: bool = True) -> bytes:
+        return struct.pack("<IIHHHHII", 0, 0, 0, 0, 0, 1, resource_id, offset | (0x80000000 if subdirectory else 0))
+
+    resources = directory(16 if version else 3, 0x18) + directory(1, 0x30) + directory(0x409, 0x48, False)
+    resources += struct.pack("<IIII", RESOURCE_RVA + 0x58, len(version_info), 0, 0) + b"\0" * 8 + version_info
+
+    optional_header_size = 240 if pe32_plus else 224
+    data_directories = [(0, 0)] * 16
+    data_directories[2] = (RESOURCE_RVA, len(resources))
+    optional_header = bytearray(optional_header_size)
+    struct.pack_into("<H", optional_header, 0, 0x20B if pe32_plus else 0x10B)
+    directories_offset = 108 if pe32_plus else 92
+    struct.pack_into("<I", optional_header, directories_offset, 16)
+    for i, (rva, size) in enumerate(data_directories):
+        struct.pack_into("<II", optional_header, directories_offset + 4 + 8 * i, rva, size)
+
+    image = bytearray(b"MZ" + b"\0" * 0x3A + struct.pack("<I", 0x40))
+    image += b"PE\0\0" + struct.pack("<HHIIIHH", 0x8664, 1, 0, 0, 0, optional_header_size, 0x22)
+    image += optional_header
+    image += struct.pack(
+        "<8sIIIIIIHHI", b".rsrc", len(resources), RESOURCE_RVA, len(resources), RESOURCE_OFFSET, 0, 0, 0, 0, 0
+    )
+    image += b"\0" * (RESOURCE_OFFSET - len(image)) + resources
+    return bytes(image)
+
+
+@pytest.mark.parametrize("pe32_plus", (True, False), ids=("pe32+", "pe32"))
+def test_file_version(tmp_path: Path, pe32_plus: bool) -> None:
+    executable = tmp_path / "msedge.exe"
+    executable.write_bytes(build_pe((120, 0, 2210, 91), pe32_plus))
+    assert pe.file_version(str(executable)) == "120.0.2210.91"
+    assert windows._get_file_version(str(executable)) == "120.0.2210.91"
+
+
+def test_file_version_is_memoized(tmp_path: Path) -> None:
+    executable = tmp_path / "chrome.exe"
+    executable.write_bytes(build_pe((120, 0, 6099, 109)))
+    pe._file_version.cache_clear()
+
+    assert [pe.file_version(str(executable)) for _ in range(3)] == ["120.0.6099.109"] * 3
+    assert pe._file_version.cache_info().misses == 1
+
+    executable.write_bytes(build_pe((121, 0, 6167, 85)))
+    os.utime(executable, ns=(0, executable.stat().st_mtime_ns + 1_000_000_000))
+    assert pe.file_version(str(executable)) == "121.0.6167.85"
+
+
+def test_missing_version(tmp_path: Path) -> None:
+    (tmp_path / "no-version.exe").write_bytes(build_pe(None))
+    (tmp_path / "script.exe").write_text("#!/bin/sh\n")
+    (tmp_path / "truncated.exe").write_bytes(build_pe((1, 2, 3, 4))[:0x220])
+
+    for name in ("no-version.exe", "script.exe", "truncated.exe", "missing.exe"):
+        assert pe.file_version(str(tmp_path / name)) == ""
+    with pytest.raises(ValueError, match="DOS header"):
+        pe.read_file_version(b"#!/bin/sh\n")
@@ -0,0 +1,84 @@
+import sys
+import threading
+
+import pytest
+
+from browsers import Browser, BrowserPool, Inventory
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="posix-only")
+
+SLEEPER = Browser(browser_type="sleeper", path="/bin/sleep", display_name="Sleeper", version="1.0")
+
+
+@pytest.fixture
+def inventory() -> Inventory:
+    return Inventory(scan=lambda: [SLEEPER])
+
+
+def test_acquire_and_release(inventory: Inventory) -> None:
+    with BrowserPool("sleeper", size=2, args=["60"], inventory=inventory) as pool:
+        first = pool.acquire()
+        second = pool.acquire()
+        assert first.process.pid != second.process.pid
+        assert first.process.poll() is None
+
+        with pytest.raises(TimeoutError):
+            pool.acquire(timeout=0.1)
+
+        pool.release(first)
+        assert pool.acquire() is first
+        assert first.uses == 2
+
+    assert first.process.poll() is not None
+    assert second.process.poll() is not None
+    assert pool.metrics.spawned == 2
+    assert len(pool.metrics.spawn_times) == 2
+    assert len(pool.metrics.acquire_waits) == 3
+
+
+def test_recycle_after_max_uses(inventory: Inventory) -> None:
+    with BrowserPool("sleeper", size=1, args=["60"], max_uses=2, inventory=inventory) as pool:
+        with pool.lease() as first:
+            pass
+        with pool.lease() as second:
+            assert second is first
+        with pool.lease() as third:
+            assert third is not first
+            assert third.uses == 1
+
+    assert first.process.poll() is not None
+    assert pool.metrics.recycled == 1
+    assert pool.metrics.spawned == 2
+
+
+def test_replace_exited_browser(inventory: Inventory) -> None:
+    with BrowserPool("sleeper", size=1, args=["0"], inventory=inventory) as pool:
+        exited = pool.acquire()
+        exited.process.wait()
+        pool.release(exited)
+
+        assert pool.acquire() is not exited
+
+
+def test_waiting_acquire(inventory: Inventory) -> None:
+    with BrowserPool("sleeper", size=1, args=["60"], inventory=inventory) as pool:
+        instance = pool.acquire()
+        threading.Timer(0.2, pool.release, (instance,)).start()
+
+        assert pool.acquire(timeout=5) is instance
+        assert max(pool.metrics.acquire_waits) >= 0.2
+
+
+def test_missing_browser(inventory: Inventory) -> None:
+    with pytest.raises(ValueError):
+        BrowserPool("firefox", inventory=inventory)
+
+
+def test_close_while_leased(inventory: Inventory) -> None:
+    pool = BrowserPool("sleeper", size=1, args=["60"], max_uses=1, inventory=inventory)
+    with pool.lease() as instance:
+        pool.close()
+
+    assert instance.process.poll() is not None
+    assert pool.metrics.spawned == 1
+    assert pool.metrics.recycled == 0
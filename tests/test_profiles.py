@@ -0,0 +1,70 @@
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+import browsers
+from browsers import profiles
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="unix-only")
+
+
+@pytest.fixture
+def template(tmp_path: Path) -> Path:
+    template = tmp_path / "template"
+    (template / "Default").mkdir(parents=True)
+    (template / "Default" / "Preferences").write_text("{}")
+    (template / "Local State").write_text("{}")
+    (template / "SingletonLock").symlink_to("host-1234")
+    return template
+
+
+def test_create_profile(tmp_path: Path, template: Path) -> None:
+    for hardlinks in (False, True):
+        profile = profiles.create_profile(str(template), root=str(tmp_path), hardlinks=hardlinks)
+        path = Path(profile.path)
+
+        assert path.name.startswith(profiles.PROFILE_PREFIX)
+        assert sorted(p.relative_to(path).as_posix() for p in path.rglob("*")) == [
+            "Default",
+            "Default/Preferences",
+            "Local State",
+        ]
+        assert ((path / "Local State").stat().st_ino == (template / "Local State").stat().st_ino) is hardlinks
+        assert profile.creation_time >= 0
+
+        profile.remove()
+        assert not path.exists()
+
+
+def test_launch_with_ephemeral_profile(tmp_path: Path, template: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(profiles, "PROFILE_ROOT", str(tmp_path))
+    output = tmp_path / "output.json"
+    executable = tmp_path / "chrome"
+    executable.write_text(
+        f"#!{sys.executable}\nimport json, os, sys\n"
+        "profile = sys.argv[1].split('=', 1)[1]\n"
+        f"json.dump([sys.argv[1:], sorted(os.listdir(profile))], open({str(output)!r}, 'w'))\n"
+    )
+    executable.chmod(0o755)
+    chrome = browsers.Browser(browser_type="chrome", path=str(executable), display_name="Chrome", version="1.0")
+    inventory = browsers.Inventory(scan=lambda: [chrome])
+
+    handle = browsers.launch("chrome", inventory=inventory, ephemeral_profile=str(template))
+    assert handle is not None
+    assert handle.process.wait() == 0
+    assert handle.profile is not None and handle.profile_time is not None
+
+    args, files = json.loads(output.read_text())
+    assert args == [f"--user-data-dir={handle.profile}"]
+    assert files == ["Default", "Local State"]
+
+    deadline = time.monotonic() + 5
+    while Path(handle.profile).exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not Path(handle.profile).exists()
+
+    with pytest.raises(ValueError):
+        browsers.launch("chrome", args=["--user-data-dir=/tmp/x"], inventory=inventory, ephemeral_profile=True)
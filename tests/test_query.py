@@ -0,0 +1,50 @@
+import pytest
+
+import browsers
+from browsers import Browser, Inventory
+from browsers.query import BrowserIndex
+
+
+def chrome(version: str) -> Browser:
+    return Browser(browser_type="chrome", path=f"/opt/chrome-{version}/chrome", display_name="Chrome", version=version)
+
+
+INSTALLED = [chrome("119.0.6045.105"), chrome("121.0.6167.85"), chrome("120.0.6099.109"), chrome("")]
+
+
+@pytest.mark.parametrize(
+    ("version", "expected"),
+    (
+        pytest.param("*", ["121.0.6167.85", "120.0.6099.109", "119.0.6045.105", ""], id="any"),
+        pytest.param("120.*", ["120.0.6099.109"], id="wildcard"),
+        pytest.param(">=120", ["121.0.6167.85", "120.0.6099.109"], id="minimum"),
+        pytest.param(">=120,<121", ["120.0.6099.109"], id="range"),
+        pytest.param("~=120.0", ["120.0.6099.109"], id="compatible"),
+        pytest.param("!=120.0.6099.109,1*", ["121.0.6167.85", "119.0.6045.105"], id="exclude"),
+        pytest.param(">=200", [], id="no-match"),
+    ),
+)
+def test_find(version: str, expected: list[str]) -> None:
+    assert [b["version"] for b in BrowserIndex(INSTALLED).find("chrome", version)] == expected
+
+
+def test_select() -> None:
+    index = BrowserIndex(INSTALLED)
+
+    assert index.select("chrome", ">=120") == chrome("121.0.6167.85")
+    assert index.select("chrome", ">=120", order="oldest") == chrome("120.0.6099.109")
+    assert index.select("firefox") is None
+
+
+def test_invalid_spec() -> None:
+    with pytest.raises(ValueError):
+        BrowserIndex(INSTALLED).find("chrome", "~=120")
+
+
+def test_top_level_api() -> None:
+    inventory = Inventory(scan=lambda: INSTALLED)
+
+    assert browsers.select("chrome", "<121", inventory=inventory) == chrome("120.0.6099.109")
+    assert browsers.find("chrome", ">=120", order="oldest", inventory=inventory) == INSTALLED[2:0:-1]
+    assert browsers.get("chrome", ">=120", inventory=inventory) == chrome("121.0.6167.85")
+    assert inventory.index() is inventory.index()
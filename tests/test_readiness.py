@@ -0,0 +1,82 @@
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+import browsers
+from browsers import Browser, Inventory
+from browsers.readiness import free_port
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="posix-only")
+
+STUB = textwrap.dedent(
+    """\
+    import http.server
+    import sys
+    import time
+
+    args = sys.argv[1:]
+    name, _, port = next(arg for arg in args if arg.startswith("--remote-debugging-port")).partition("=")
+    port = port or args[args.index(name) + 1]
+    time.sleep(float(sys.argv[0].rpartition("-")[2]))
+    if "--crash" in args:
+        sys.exit(3)
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+    http.server.HTTPServer(("127.0.0.1", int(port)), Handler).serve_forever()
+    """
+)
+
+
+def stub_inventory(tmp_path: Path, browser_type: str, delay: float) -> Inventory:
+    """
+    A browser which opens its remote debugging port after a delay (encoded in its file name).
+    """
+    executable = tmp_path / f"stub-{delay}"
+    executable.write_text(f"#!{sys.executable}\n{STUB}")
+    executable.chmod(0o755)
+    browser = Browser(browser_type=browser_type, path=str(executable), display_name="Stub", version="1.0")
+    return Inventory(scan=lambda: [browser])
+
+
+@pytest.mark.parametrize("browser_type", ("chrome", "firefox"))
+def test_launch_ready(tmp_path: Path, browser_type: str) -> None:
+    handle = browsers.launch(browser_type, inventory=stub_inventory(tmp_path, browser_type, 0.5), ready=True)
+
+    assert handle is not None
+    try:
+        assert handle.port is not None
+        assert handle.startup_time is not None
+        assert 0.5 <= handle.startup_time < 10
+        assert handle.process.poll() is None
+    finally:
+        handle.process.kill()
+        handle.process.wait()
+
+
+def test_launch_ready_with_port_in_args(tmp_path: Path) -> None:
+    port = free_port()
+    handle = browsers.launch(
+        "chrome", inventory=stub_inventory(tmp_path, "chrome", 0), args=[f"--remote-debugging-port={port}"], ready=True
+    )
+
+    assert handle is not None
+    handle.process.kill()
+    handle.process.wait()
+    assert handle.port == port
+
+
+def test_launch_ready_timeout(tmp_path: Path) -> None:
+    with pytest.raises(TimeoutError):
+        browsers.launch("chrome", inventory=stub_inventory(tmp_path, "chrome", 5), ready=True, ready_timeout=0.3)
+
+
+def test_launch_ready_exited(tmp_path: Path) -> None:
+    with pytest.raises(RuntimeError):
+        browsers.launch("chrome", inventory=stub_inventory(tmp_path, "chrome", 0), args=["--crash"], ready=True)
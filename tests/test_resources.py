@@ -0,0 +1,55 @@
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import browsers
+from browsers import resources
+
+pytestmark = pytest.mark.skipif(sys.platform != "linux", reason="linux-only")
+
+SCRIPT = """
+import os
+import resource
+
+print(sorted(os.sched_getaffinity(0)))
+print(os.nice(0))
+print(resource.getrlimit(resource.RLIMIT_NOFILE)[0], resource.getrlimit(resource.RLIMIT_AS)[0])
+"""
+
+
+def test_limits_are_applied() -> None:
+    cpu = min(os.sched_getaffinity(0))
+    limits = browsers.ResourceLimits(cpus=[cpu], nice=5, open_files=64, address_space=8 << 30)
+
+    process = browsers._launch(
+        "python", sys.executable, ["-c", SCRIPT], limits=limits, stdout=subprocess.PIPE, text=True
+    )
+    stdout, _ = process.communicate()
+
+    assert stdout.splitlines() == [f"[{cpu}]", str(os.nice(0) + 5), f"64 {8 << 30}"]
+
+
+@pytest.mark.skipif(shutil.which("ionice") is None, reason="ionice is not installed")
+def test_io_scheduling() -> None:
+    limits = browsers.ResourceLimits(io_class=3)
+    assert limits.command(["/usr/bin/firefox"]) == ["ionice", "-c", "3", "/usr/bin/firefox"]
+
+    process = browsers._launch("ionice", "ionice", [], limits=limits, stdout=subprocess.PIPE, text=True)
+    stdout, _ = process.communicate()
+    assert stdout.strip() == "idle"
+
+
+def test_cgroup(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    (tmp_path / "browsers.slice").mkdir()
+    monkeypatch.setattr(resources, "CGROUP_ROOT", str(tmp_path))
+
+    limits = browsers.ResourceLimits(cgroup="browsers.slice")
+    assert limits.preexec_fn() is None  # moved by a wrapper shell, not between fork and exec
+
+    process = browsers._launch("true", "true", [], limits=limits)
+    assert process.wait() == 0
+    assert (tmp_path / "browsers.slice" / "cgroup.procs").read_text() == "0"
@@ -0,0 +1,110 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+import browsers
+from browsers import roots
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="symlinks of a Linux root")
+
+
+def write(path: Path, content: str = "", executable: bool = False) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    if executable:
+        path.chmod(0o755)
+    return path
+
+
+def symlink(path: Path, target: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.symlink_to(target)
+
+
+@pytest.fixture
+def image(tmp_path: Path) -> Path:
+    """
+    A root filesystem whose absolute symlinks would point to the host if they were not resolved inside the root.
+    Its executables leave a marker file if they are run.
+    """
+    root = tmp_path / "image"
+    marker = tmp_path / "executed"
+    script = f"#!/bin/sh\ntouch {marker}\n"
+
+    applications = root / "usr/share/applications"
+    write(applications / "firefox.desktop", "[Desktop Entry]\nName=Firefox\nExec=firefox %u\nCategories=WebBrowser;\n")
+    write(root / "usr/lib/firefox/firefox", script, executable=True)
+    write(root / "usr/lib/firefox/application.ini", "[App]\nName=Firefox\nVersion=124.0.2\n")
+    symlink(root / "usr/bin/firefox", "/usr/lib/firefox/firefox")
+
+    write(
+        applications / "google-chrome.desktop",
+        "[Desktop Entry]\nName=Google Chrome\nExec=/usr/bin/google-chrome-stable %U\nCategories=Network;WebBrowser;\n",
+    )
+    write(root / "opt/google/chrome/google-chrome", script, executable=True)
+    (root / "opt/google/chrome/120.0.6099.109").mkdir()
+    symlink(root / "etc/alternatives/google-chrome", "/opt/google/chrome/google-chrome")
+    symlink(root / "usr/bin/google-chrome-stable", "../../etc/alternatives/google-chrome")
+
+    write(
+        root / "var/lib/snapd/desktop/applications/chromium_chromium.desktop",
+        "[Desktop Entry]\nName=Chromium\nExec=/snap/bin/chromium %U\nCategories=Network;WebBrowser;\n",
+    )
+    write(root / "usr/bin/snap", script, executable=True)
+    symlink(root / "snap/bin/chromium", "/usr/bin/snap")
+    write(root / "snap/chromium/2700/meta/snap.yaml", "name: chromium\nversion: 120.0.6099.71\n")
+    symlink(root / "snap/chromium/current", "2700")
+
+    # not installed in the image, even if the host has it
+    write(applications / "vivaldi.desktop", "[Desktop Entry]\nName=Vivaldi\nExec=sh %U\nCategories=WebBrowser;\n")
+    return root
+
+
+def test_root_browsers(image: Path) -> None:
+    # directory entries are listed in arbitrary order
+    assert sorted(browsers.browsers(root=str(image)), key=lambda b: b["path"]) == [
+        {
+            "browser_type": "chromium",
+            "path": "/snap/bin/chromium",
+            "display_name": "Chromium",
+            "version": "120.0.6099.71",
+            "packaging": "snap",
+        },
+        {"browser_type": "firefox", "path": "/usr/bin/firefox", "display_name": "Firefox", "version": "124.0.2"},
+        {
+            "browser_type": "chrome",
+            "path": "/usr/bin/google-chrome-stable",
+            "display_name": "Google Chrome",
+            "version": "120.0.6099.109",
+        },
+    ]
+    assert [b["browser_type"] for b in browsers.browsers("chromium", root=str(image), lazy=True)] == ["chromium"]
+    assert not (image.parent / "executed").exists()
+
+
+def test_resolve_stays_inside_root(tmp_path: Path) -> None:
+    symlink(tmp_path / "usr/bin/escape", "../../../../../etc")
+    symlink(tmp_path / "usr/bin/absolute", "/usr/lib")
+    symlink(tmp_path / "loop", "/loop")
+
+    assert roots.resolve(str(tmp_path), "/usr/bin/escape/passwd") == os.path.join(tmp_path, "etc", "passwd")
+    assert roots.resolve(str(tmp_path), "/usr/bin/absolute/../share/./x") == os.path.join(tmp_path, "usr", "share", "x")
+    with pytest.raises(OSError):
+        roots.resolve(str(tmp_path), "/loop/x")
+    assert not roots.exists(str(tmp_path), "/loop")
+    assert roots.which(str(tmp_path), "sh") is None
+
+
+def test_scan_roots(image: Path, tmp_path: Path) -> None:
+    empty = tmp_path / "empty"
+    empty.mkdir()
+
+    results = dict(browsers.scan_roots([str(image), str(empty)], browser_type="firefox", max_workers=2))
+    assert results == {
+        str(image): [
+            {"browser_type": "firefox", "path": "/usr/bin/firefox", "display_name": "Firefox", "version": "124.0.2"}
+        ],
+        str(empty): [],
+    }
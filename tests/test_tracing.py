@@ -0,0 +1,47 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from browsers import linux, tracing
+
+from .conftest import FakeBrowser
+
+pytestmark = pytest.mark.skipif(sys.platform != "linux", reason="linux-only")
+
+
+def test_recording(fake_browser: FakeBrowser, applications_dir: Path) -> None:
+    fake_browser("Firefox", "124.0", "firefox")
+    fake_browser("Vivaldi", "6.5", "vivaldi")
+    (applications_dir / "editor.desktop").write_text("[Desktop Entry]\nName=Editor\nCategories=Utility;\n")
+
+    with tracing.recording() as recorder:
+        assert len(list(linux.browsers())) == 2
+
+    assert tracing.HOOKS == ()
+    assert recorder.counters == {tracing.FILES_SCANNED: 3, tracing.FILES_REJECTED: 1, tracing.PROBES_SPAWNED: 2}
+    durations = recorder.durations()
+    assert {"linux.list", "linux.parse", "linux.static_version", "linux.probe"} <= durations.keys()
+    assert all(duration >= 0 for duration in durations.values())
+    probed = {event.candidate for event in recorder.events if getattr(event, "stage", None) == "linux.probe"}
+    assert {Path(candidate).name for candidate in probed if candidate} == {"firefox", "vivaldi"}
+
+
+def test_probe_timeout(fake_browser: FakeBrowser, monkeypatch: pytest.MonkeyPatch) -> None:
+    fake_browser("Firefox", "124.0", "firefox", delay=5)
+    monkeypatch.setattr(linux, "PROBE_TIMEOUT", 0.2)
+
+    with tracing.recording() as recorder:
+        assert [b["version"] for b in linux.browsers()] == [""]
+    assert recorder.counters[tracing.PROBE_TIMEOUTS] == 1
+
+
+def test_failing_hook(fake_browser: FakeBrowser, caplog: pytest.LogCaptureFixture) -> None:
+    fake_browser("Firefox", "124.0", "firefox")
+
+    def failing_hook(event: tracing.Event) -> None:
+        raise RuntimeError
+
+    with tracing.hook(failing_hook):
+        assert [b["version"] for b in linux.browsers()] == ["124.0"]
+    assert "Tracing hook" in caplog.text
@@ -0,0 +1,96 @@
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from browsers import linux, versions
+
+from .conftest import FakeBrowser
+
+
+def test_application_ini(tmp_path: Path) -> None:
+    (tmp_path / "application.ini").write_text("[App]\nVendor=Mozilla\nName=Firefox\nVersion=124.0.2\n\n[Gecko]\n")
+    assert versions.read_static_version("firefox", str(tmp_path / "firefox")) == "124.0.2"
+
+
+def test_platform_ini(tmp_path: Path) -> None:
+    (tmp_path / "platform.ini").write_text("[Build]\nBuildID=20240401114208\nMilestone=124.0.2\n")
+    assert versions.read_static_version("firefox-nightly", str(tmp_path / "firefox")) == "124.0.2"
+
+
+def test_version_directory(tmp_path: Path) -> None:
+    for name in ("99.0.1150.55", "120.0.2210.91", "Locales"):
+        (tmp_path / name).mkdir()
+    assert versions.read_static_version("msedge", str(tmp_path / "msedge")) == "120.0.2210.91"
+
+
+def test_embedded_version(tmp_path: Path) -> None:
+    (tmp_path / "google-chrome").write_text('#!/bin/bash\nexec -a "$0" "$HERE/chrome" "$@"\n')
+    (tmp_path / "chrome").write_bytes(b"\x7fXYZ\x00127.0.0.1\x001.0.0\x00Chrome\x00120.0.6099.109\x00\x00")
+    assert versions.read_static_version("chrome", str(tmp_path / "google-chrome")) == "120.0.6099.109"
+
+
+def test_unsupported_browser(tmp_path: Path) -> None:
+    (tmp_path / "application.ini").write_text("[App]\nVersion=1.0\n")
+    assert versions.read_static_version("brave", str(tmp_path / "brave")) == ""
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="linux-only")
+def test_static_version_skips_probe(fake_browser: FakeBrowser) -> None:
+    executable = fake_browser("Firefox", "100.0")
+    (executable.parent / "application.ini").write_text("[App]\nVersion=101.0\n")
+
+    with mock.patch("subprocess.Popen", side_effect=AssertionError("should not probe")):
+        assert [b["version"] for b in linux.browsers()] == ["101.0"]
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="linux-only")
+def test_snap_version(tmp_path: Path, applications_dir: Path) -> None:
+    snap_dir = tmp_path / "snap"
+    (snap_dir / "bin").mkdir(parents=True)
+    (tmp_path / "snap-launcher").mkdir()
+    (tmp_path / "snap-launcher" / "snap").write_text("#!/bin/sh\nsleep 30\n")
+    (tmp_path / "snap-launcher" / "snap").chmod(0o755)
+    (snap_dir / "bin" / "firefox").symlink_to(tmp_path / "snap-launcher" / "snap")
+    (snap_dir / "firefox" / "current" / "meta").mkdir(parents=True)
+    (snap_dir / "firefox" / "current" / "meta" / "snap.yaml").write_text(
+        "name: firefox\nversion: '124.0.2-1'\napps:\n  firefox:\n    version: ignored\n"
+    )
+    (applications_dir / "firefox_firefox.desktop").write_text(
+        f"[Desktop Entry]\nName=Firefox Web Browser\nExec=env BAMF_DESKTOP_FILE_HINT=x {snap_dir}/bin/firefox %u\n"
+        "Categories=Network;WebBrowser;\n"
+    )
+
+    with mock.patch("subprocess.Popen", side_effect=AssertionError("should not probe")):
+        (browser,) = linux.browsers()
+    assert browser["version"] == "124.0.2-1"
+    assert browser["packaging"] == "snap"
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="linux-only")
+def test_flatpak_version(tmp_path: Path, applications_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    installation_dir = tmp_path / "flatpak"
+    exports_dir = installation_dir / "exports"
+    (exports_dir / "share" / "applications").mkdir(parents=True)
+    (exports_dir / "share" / "applications" / "org.mozilla.firefox.desktop").write_text(
+        "[Desktop Entry]\nName=Firefox\nExec=/usr/bin/flatpak run org.mozilla.firefox %u\n"
+        "X-Flatpak=org.mozilla.firefox\nCategories=Network;WebBrowser;\n"
+    )
+    metainfo_dir = installation_dir / "app/org.mozilla.firefox/current/active/files/share/metainfo"
+    metainfo_dir.mkdir(parents=True)
+    (metainfo_dir / "org.mozilla.firefox.metainfo.xml").write_text(
+        '<component><releases><release date="2024-04-02" version="124.0.2"/><release version="124.0.1"/>'
+        "</releases></component>"
+    )
+    monkeypatch.setenv("XDG_DATA_DIRS", str(exports_dir / "share"))
+
+    with mock.patch("subprocess.Popen", side_effect=AssertionError("should not probe")):
+        (browser,) = linux.browsers()
+    assert browser == {
+        "browser_type": "firefox",
+        "path": str(exports_dir / "bin" / "org.mozilla.firefox"),
+        "display_name": "Firefox",
+        "version": "124.0.2",
+        "packaging": "flatpak",
+    }